@@ -25,26 +25,14 @@ for file_path in files:
     print(f"Quote col: {quote_col}, Settlement col: {settlement_col}")
     
     if quote_col is not None:
-        file_quote_total = 0
-        for i in range(17, df.shape[0]):
-            val = df.iloc[i, quote_col]
-            if pd.notna(val):
-                try:
-                    file_quote_total += float(val)
-                except:
-                    pass
+        # 第18行起整列转数值，无法转换的单元格记为 NaN 并在求和时跳过
+        file_quote_total = pd.to_numeric(df.iloc[17:, quote_col], errors='coerce').sum()
         total_quote += file_quote_total
         print(f"Quote total: {file_quote_total}")
     
     if settlement_col is not None:
-        file_settlement_total = 0
-        for i in range(17, df.shape[0]):
-            val = df.iloc[i, settlement_col]
-            if pd.notna(val):
-                try:
-                    file_settlement_total += float(val)
-                except:
-                    pass
+        # 第18行起整列转数值，无法转换的单元格记为 NaN 并在求和时跳过
+        file_settlement_total = pd.to_numeric(df.iloc[17:, settlement_col], errors='coerce').sum()
         total_settlement += file_settlement_total
         print(f"Settlement total: {file_settlement_total}")
 
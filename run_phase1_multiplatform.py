@@ -14,6 +14,7 @@ import warnings
 from pathlib import Path
 from decimal import Decimal
 from collections import defaultdict
+from functools import lru_cache
 import pandas as pd
 
 # 忽略 openpyxl 警告
@@ -28,7 +29,85 @@ from src.parser.temu_parser import TemuParser
 from src.parser.shein_parser import SheinParser
 from src.parser.managed_store_parser import ManagedStoreParser
 from src.parser.aliexpress_parser import AliExpressParser
-from src.calculator.revenue_calculator import RevenueCalculator
+from src.parser.parallel_utils import map_files
+
+
+PARSER_CLASSES = {
+    'amazon': AmazonCSVParser,
+    'temu': TemuParser,
+    'shein': SheinParser,
+    'managed_store': ManagedStoreParser,
+    'aliexpress': AliExpressParser,
+}
+
+@lru_cache(maxsize=None)
+def _get_parser(platform: str):
+    """解析器实例按进程缓存（子进程中各自创建一次）"""
+    return PARSER_CLASSES[platform]()
+
+
+def process_file(platform: str, pf: PlatformFile):
+    """
+    解析并计算单个平台文件
+    
+    Returns:
+        (result, error)：result 为结果字典（金额为 Decimal），无交易时为 None；
+        error 为 (文件路径, 错误信息)，成功时为 None
+    """
+    try:
+        parser = _get_parser(platform)
+        
+        # 解析 - Amazon 返回 ParseResult，其他返回 (txns, meta) 元组
+        if platform == 'amazon':
+            parse_result = parser.parse(pf.file_path)
+            if not parse_result.success:
+                return None, (pf.file_path, '; '.join(parse_result.errors))
+            txns = parse_result.transactions
+            meta = {
+                'store_name': parse_result.store_name,
+                'site': parse_result.marketplace,
+                'currency': parse_result.currency,
+                'year_month': parse_result.year_month,
+            }
+        else:
+            txns, meta = parser.parse(pf.file_path)
+        
+        if not txns:
+            return None, None
+        
+        # 计算 - 单次遍历分离 Transfer，同时累加净结算/提现金额
+        net_settlement = Decimal('0')
+        transfer_amount = Decimal('0')
+        included_count = 0
+        for t in txns:
+            if t.is_excluded_from_revenue():
+                transfer_amount += t.total
+            else:
+                net_settlement += t.total
+                included_count += 1
+        excluded_count = len(txns) - included_count
+        
+        store_name = meta.get('store_name', pf.store_name)
+        currency = meta.get('currency', 'USD')
+        # 解析器未解析出月份时（如日期列为空），用扫描器从文件夹得到的月份
+        year_month = meta.get('year_month') or pf.year_month
+        site = meta.get('site', '')
+        
+        return {
+            'platform': platform,
+            'store_name': store_name,
+            'site': site,
+            'year_month': year_month,
+            'currency': currency,
+            'total_records': len(txns),
+            'included_records': included_count,
+            'excluded_records': excluded_count,
+            'net_settlement': net_settlement,
+            'transfer_amount': transfer_amount,
+        }, None
+        
+    except Exception as e:
+        return None, (pf.file_path, str(e))
 
 
 def run_phase1_multiplatform():
@@ -53,76 +132,33 @@ def run_phase1_multiplatform():
         if files:
             print(f"  - {platform}: {len(files)} 个")
     
-    # 2. 解析并计算
-    calculator = RevenueCalculator()
+    # 2. 解析并计算（各文件相互独立，文件较多时多进程并行）
     results = []  # (platform, store, month, currency, net_settlement, transfer)
     errors = []
     
-    parsers = {
-        'amazon': AmazonCSVParser(),
-        'temu': TemuParser(),
-        'shein': SheinParser(),
-        'managed_store': ManagedStoreParser(),
-        'aliexpress': AliExpressParser(),
-    }
+    jobs = [
+        (platform, pf)
+        for platform, files in platform_files.items()
+        if platform in PARSER_CLASSES
+        for pf in files
+    ]
     
-    for platform, files in platform_files.items():
-        parser = parsers.get(platform)
-        if not parser:
+    # 结果保持提交顺序，输出与串行执行一致
+    outcomes = map_files(process_file, *zip(*jobs)) if jobs else []
+    
+    for result, error in outcomes:
+        if error:
+            errors.append(error)
             continue
+        if result is None:
+            continue
+        
+        net_settlement = result['net_settlement']
+        print(f"✓ {result['platform']:12s} | {result['store_name'][:15]:15s} | {result['year_month']:7s} | {net_settlement:>12,.2f} {result['currency']}")
         
-        for pf in files:
-            try:
-                # 解析 - Amazon 返回 ParseResult，其他返回 (txns, meta) 元组
-                if platform == 'amazon':
-                    parse_result = parser.parse(pf.file_path)
-                    if not parse_result.success:
-                        errors.append((pf.file_path, '; '.join(parse_result.errors)))
-                        continue
-                    txns = parse_result.transactions
-                    meta = {
-                        'store_name': parse_result.store_name,
-                        'site': parse_result.marketplace,
-                        'currency': parse_result.currency,
-                        'year_month': parse_result.year_month,
-                    }
-                else:
-                    txns, meta = parser.parse(pf.file_path)
-                
-                if not txns:
-                    continue
-                
-                # 计算 - 分离 Transfer
-                included = [t for t in txns if not t.is_excluded_from_revenue()]
-                excluded = [t for t in txns if t.is_excluded_from_revenue()]
-                
-                net_settlement = sum(t.total for t in included)
-                transfer_amount = sum(t.total for t in excluded)
-                
-                store_name = meta.get('store_name', pf.store_name)
-                currency = meta.get('currency', 'USD')
-                # 解析器未解析出月份时（如日期列为空），用扫描器从文件夹得到的月份
-                year_month = meta.get('year_month') or pf.year_month
-                site = meta.get('site', '')
-                
-                results.append({
-                    'platform': platform,
-                    'store_name': store_name,
-                    'site': site,
-                    'year_month': year_month,
-                    'currency': currency,
-                    'total_records': len(txns),
-                    'included_records': len(included),
-                    'excluded_records': len(excluded),
-                    'net_settlement': float(net_settlement),
-                    'transfer_amount': float(transfer_amount),
-                })
-                
-                
-                print(f"✓ {platform:12s} | {store_name[:15]:15s} | {year_month:7s} | {net_settlement:>12,.2f} {currency}")
-                
-            except Exception as e:
-                errors.append((pf.file_path, str(e)))
+        result['net_settlement'] = float(net_settlement)
+        result['transfer_amount'] = float(result['transfer_amount'])
+        results.append(result)
     
     # 3. 生成报表
     print(f"\n成功处理: {len(results)} 个文件")
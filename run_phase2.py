@@ -23,6 +23,40 @@ from src.parser.warehouse_parser import aggregate_warehouse_costs, WarehouseMont
 
 warnings.filterwarnings('ignore')
 
+# pyarrow 可选：安装时以 Arrow 列读取 Phase 1 报表，'平台净结算' 等数值列直接落在 Arrow 内存上，
+# 省去 object/float64 装箱，后续 groupby/sum 仍是同样的 pandas API
+try:
+    import pyarrow  # noqa: F401
+    READ_XLSX = {'dtype_backend': 'pyarrow'}
+except ImportError:
+    READ_XLSX = {}
+
+# 仓库 -> 区域
+WAREHOUSE_REGIONS = {
+    'TSP': 'UK',
+    '1510': 'UK',
+    '京东': 'Global',
+    '海洋': 'UK',
+    'LHZ': 'DE',
+    '奥韵汇': 'DE',
+    '东方嘉盛': 'CN',
+    'G7': 'DE',
+}
+
+
+def _sum_revenue(values) -> Decimal:
+    """对一组「平台净结算」值求 Decimal 合计，空值 / 0 / 无法解析的值跳过"""
+    total = Decimal('0')
+    for v in values:
+        # Arrow 列的空值为 pd.NA，不能直接做布尔判断，先判空
+        if pd.isna(v) or not v:
+            continue
+        try:
+            total += Decimal(str(v))
+        except Exception:
+            pass
+    return total
+
 
 def run_phase2():
     """Phase 2 主入口"""
@@ -55,7 +89,7 @@ def run_phase2():
     platform_revenue = []
     if phase1_report:
         try:
-            df = pd.read_excel(phase1_report)
+            df = pd.read_excel(phase1_report, **READ_XLSX)
             print(f"  从 Phase 1 报表加载 {len(df)} 条记录")
             platform_revenue = df.to_dict('records')
         except Exception as e:
@@ -101,7 +135,7 @@ def run_phase2():
                 warehouse_rows.append({
                     '月份': c.year_month,
                     '仓库': c.warehouse_name,
-                    '区域': {'TSP': 'UK', '1510': 'UK', '京东': 'Global', '海洋': 'UK', 'LHZ': 'DE', '奥韵汇': 'DE', '东方嘉盛': 'CN', 'G7': 'DE'}.get(c.warehouse_name, '-'),
+                    '区域': WAREHOUSE_REGIONS.get(c.warehouse_name, '-'),
                     '履约成本合计': float(c.total_cost),
                     '币种': c.currency,
                     '记录数': c.record_count,
@@ -116,25 +150,22 @@ def run_phase2():
             # 按月份汇总
             monthly_summary = {}
             
-            # 平台收入按月汇总
-            if platform_revenue:
-                for row in platform_revenue:
-                    # 月份列
-                    month_val = str(row.get('月份', ''))[:7] if '月份' in row else None
-                    
+            # 平台收入按月汇总：按月份列分组，组内仍以 Decimal 累加保证精度
+            if platform_revenue and '月份' in df.columns:
+                # 月份为空的行保留在 'nan' 分组中（与逐行 str(NaN) 一致）；
+                # 先统一空值再转字符串，否则 Arrow 列的 pd.NA 会变成 '<NA>' 分组
+                month_col = df['月份'].astype(object)
+                months = month_col.where(month_col.notna(), 'nan').map(str).str[:7]
+                revenue_col = df['平台净结算'] if '平台净结算' in df.columns else pd.Series(0, index=df.index)
+                
+                for month_val, revenue_vals in revenue_col.groupby(months, sort=False):
                     if not month_val:
                         continue
                     
                     if month_val not in monthly_summary:
                         monthly_summary[month_val] = {'收入': Decimal('0'), '成本': Decimal('0')}
                     
-                    # 收入列 (平台净结算)
-                    revenue_val = row.get('平台净结算', 0)
-                    if revenue_val and not pd.isna(revenue_val):
-                        try:
-                            monthly_summary[month_val]['收入'] += Decimal(str(revenue_val))
-                        except:
-                            pass
+                    monthly_summary[month_val]['收入'] += _sum_revenue(revenue_vals)
             
             # 仓库成本按月汇总 (仅 GBP，简化处理)
             for c in warehouse_costs:
@@ -17,8 +17,6 @@ import sys
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from profit_accounting.pipeline.monthly_pipeline import MonthlyAccountingPipeline
-
 
 def setup_logging(verbose: bool = False):
     """配置日志"""
@@ -121,6 +119,10 @@ def main():
     
     # 执行核算
     try:
+        # 核算流水线依赖 pandas 等重型模块，参数校验通过后再导入，
+        # 使 --help / 参数错误时快速返回
+        from profit_accounting.pipeline.monthly_pipeline import MonthlyAccountingPipeline
+        
         logger.info("初始化核算流水线...")
         pipeline = MonthlyAccountingPipeline(args.config_dir)
         
@@ -5,8 +5,9 @@
 负责将多个 CalculationResult 转换为 StoreMonthlyResult，
 并支持生成汇总报表所需的数据结构
 """
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from decimal import Decimal
+from operator import attrgetter
 from pathlib import Path
 import sys
 
@@ -14,10 +15,30 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.models import (
-    CalculationResult, StoreMonthlyResult
+    CalculationResult, FieldTotals, StoreMonthlyResult
 )
 
 
+# field_totals 归类：销售额 / 平台费用 / 税费
+_GROSS_FIELDS = attrgetter('product_sales', 'postage_credits', 'shipping_credits', 'gift_wrap_credits')
+_FEE_FIELDS = attrgetter('selling_fees', 'fba_fees', 'other_transaction_fees')
+_TAX_FIELDS = attrgetter(
+    'product_sales_tax', 'postage_credits_tax', 'shipping_credits_tax',
+    'giftwrap_credits_tax', 'promotional_rebates_tax', 'marketplace_withheld_tax',
+)
+
+_ZERO = Decimal('0')
+
+
+def _category_totals(totals: FieldTotals) -> Tuple[Decimal, Decimal, Decimal]:
+    """按归类汇总 field_totals：销售额 / 平台费用 / 税费"""
+    return (
+        sum(_GROSS_FIELDS(totals), _ZERO),
+        sum(_FEE_FIELDS(totals), _ZERO),
+        sum(_TAX_FIELDS(totals), _ZERO),
+    )
+
+
 class MonthlyAggregator:
     """月度数据聚合器"""
     
@@ -28,27 +49,7 @@ class MonthlyAggregator:
         totals = calc_result.field_totals
         
         # 计算归类汇总
-        gross_sales = (
-            totals.get('product_sales', Decimal('0')) +
-            totals.get('postage_credits', Decimal('0')) +
-            totals.get('shipping_credits', Decimal('0')) +
-            totals.get('gift_wrap_credits', Decimal('0'))
-        )
-        
-        platform_fees = (
-            totals.get('selling_fees', Decimal('0')) +
-            totals.get('fba_fees', Decimal('0')) +
-            totals.get('other_transaction_fees', Decimal('0'))
-        )
-        
-        taxes = (
-            totals.get('product_sales_tax', Decimal('0')) +
-            totals.get('postage_credits_tax', Decimal('0')) +
-            totals.get('shipping_credits_tax', Decimal('0')) +
-            totals.get('giftwrap_credits_tax', Decimal('0')) +
-            totals.get('promotional_rebates_tax', Decimal('0')) +
-            totals.get('marketplace_withheld_tax', Decimal('0'))
-        )
+        gross_sales, platform_fees, taxes = _category_totals(totals)
         
         return StoreMonthlyResult(
             store_id=calc_result.store_id,
@@ -58,16 +59,16 @@ class MonthlyAggregator:
             year_month=calc_result.year_month,
             currency=calc_result.currency,
             
-            total_records=len(calc_result.included_transactions) + len(calc_result.excluded_transactions),
-            included_records=len(calc_result.included_transactions),
-            excluded_records=len(calc_result.excluded_transactions),
+            total_records=calc_result.included_count + calc_result.excluded_count,
+            included_records=calc_result.included_count,
+            excluded_records=calc_result.excluded_count,
             
             gross_sales=gross_sales,
             platform_fees=platform_fees,
-            promotional_rebates=totals.get('promotional_rebates', Decimal('0')),
-            adjustments=Decimal('0'), # Adjustment通常在other里，这里暂存0
+            promotional_rebates=totals.promotional_rebates,
+            adjustments=_ZERO, # Adjustment通常在other里，这里暂存0
             taxes=taxes,
-            other=totals.get('other', Decimal('0')),
+            other=totals.other,
             
             platform_net_settlement=calc_result.platform_net_settlement,
             transfer_amount=calc_result.transfer_amount,
@@ -79,7 +80,7 @@ class MonthlyAggregator:
         """
         summary = {
             'total_stores': len(store_results),
-            'total_net_revenue': Decimal('0'),
+            'total_net_revenue': _ZERO,
             'currency_totals': {}
         }
         
@@ -87,7 +88,7 @@ class MonthlyAggregator:
             # 简单汇总（注意：不同币种直接相加没有意义，这里按币种分组）
             curr = res.currency
             if curr not in summary['currency_totals']:
-                summary['currency_totals'][curr] = Decimal('0')
+                summary['currency_totals'][curr] = _ZERO
             
             summary['currency_totals'][curr] += res.platform_net_settlement
         
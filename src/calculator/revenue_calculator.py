@@ -10,7 +10,7 @@
 """
 from decimal import Decimal
 from typing import List, Dict, Tuple
-from collections import defaultdict
+from operator import attrgetter
 from pathlib import Path
 import sys
 
@@ -19,10 +19,32 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.models import (
     Transaction, TransactionType, 
-    CalculationResult, StoreInfo
+    CalculationResult, FieldTotals, StoreInfo
 )
 
 
+# 参与汇总的 Transaction 数值字段（与 FieldTotals 字段一一对应）
+SUM_FIELDS = FieldTotals._fields
+
+# 一次取出上述全部字段（C 实现，返回元组）；Transaction 的这些字段均有默认值，
+# 直接按属性读取，无需 getattr 默认值兜底
+_get_sum_fields = attrgetter(*SUM_FIELDS)
+
+_ZERO = Decimal('0')
+
+# 校验容差：汇总差额超过 1 分视为不一致
+VERIFY_TOLERANCE = Decimal('0.01')
+
+
+# 交易类型按 TransactionType.code 作为下标累加到定长列表
+_TYPES = tuple(TransactionType)
+
+
+def _from_cents(cents: int) -> Decimal:
+    """整数分还原为两位小数的 Decimal（与逐笔 quantize 后相加的结果一致）"""
+    return Decimal(cents).scaleb(-2)
+
+
 class RevenueCalculator:
     """收入核算器"""
     
@@ -32,10 +54,15 @@ class RevenueCalculator:
         store_id: str = "",
         store_name: str = "",
         year_month: str = "",
-        currency: str = ""
+        currency: str = "",
+        keep_transactions: bool = False
     ) -> CalculationResult:
         """
         执行核算计算
+        
+        Args:
+            keep_transactions: 是否在结果中保留参与/排除的交易明细（审计用）；
+                默认只保留条数，避免结果对象长期持有整月交易
         """
         result = CalculationResult(
             store_id=store_id,
@@ -44,56 +71,58 @@ class RevenueCalculator:
             currency=currency
         )
         
-        # 1. 交易分类
+        # 1. 交易分类，同时完成汇总统计 (仅针对参与计算的交易)
+        # platform_net_settlement 已逐笔保留两位小数，按整数分累加，结束时再还原为 Decimal
         included = []
         excluded = []
+        excluded_count = 0
+        transfer_cents = 0
+        type_cents = [0] * len(_TYPES)
+        type_counts = [0] * len(_TYPES)
+        platform_net_cents = 0
         
         for txn in transactions:
+            cents = txn.platform_net_cents
             if txn.is_excluded_from_revenue():
-                excluded.append(txn)
+                excluded_count += 1
+                if keep_transactions:
+                    excluded.append(txn)
                 # 记录提现金额 (Transfer的net amount)
-                result.transfer_amount += txn.platform_net_settlement
+                transfer_cents += cents
             else:
                 included.append(txn)
+                # Type统计
+                ti = txn.type.code
+                type_cents[ti] += cents
+                type_counts[ti] += 1
+                # 核心指标
+                platform_net_cents += cents
         
-        result.included_transactions = included
-        result.excluded_transactions = excluded
-        
-        # 2. 汇总统计 (仅针对参与计算的交易)
-        field_totals = defaultdict(Decimal)
-        type_totals = defaultdict(Decimal)
-        type_counts = defaultdict(int)
-        
-        platform_net = Decimal('0')
+        result.included_count = len(included)
+        result.excluded_count = excluded_count
+        if keep_transactions:
+            result.included_transactions = included
+            result.excluded_transactions = excluded
+        if excluded_count:
+            result.transfer_amount += _from_cents(transfer_cents)
         
-        for txn in included:
-            # Type统计
-            type_val = txn.type.value
-            type_totals[type_val] += txn.platform_net_settlement
-            type_counts[type_val] += 1
-            
-            # 核心指标
-            platform_net += txn.platform_net_settlement
-            
-            # 字段汇总
-            # 遍历Transaction数值字段
-            for field in [
-                'product_sales', 'product_sales_tax',
-                'postage_credits', 'postage_credits_tax',
-                'shipping_credits', 'shipping_credits_tax',
-                'gift_wrap_credits', 'giftwrap_credits_tax',
-                'promotional_rebates', 'promotional_rebates_tax',
-                'marketplace_withheld_tax',
-                'selling_fees', 'fba_fees',
-                'other_transaction_fees', 'other',
-                'total'
-            ]:
-                val = getattr(txn, field, Decimal('0'))
-                field_totals[field] += val
+        # 2. 汇总结果
+        type_totals = {}
+        type_count_map = {}
+        for t, cents, count in zip(_TYPES, type_cents, type_counts):
+            if count:
+                type_totals[t.value] = _from_cents(cents)
+                type_count_map[t.value] = count
+        platform_net = _from_cents(platform_net_cents) if included else _ZERO
         
-        result.field_totals = dict(field_totals)
-        result.type_totals = dict(type_totals)
-        result.type_counts = dict(type_counts)
+        # 字段汇总：先按字段转置为列（SoA），再对每列做一次 sum，
+        # 替代逐笔交易 × 逐字段的累加；仍为 Decimal 精确求和
+        if included:
+            result.field_totals = FieldTotals._make(
+                sum(column, _ZERO) for column in zip(*map(_get_sum_fields, included))
+            )
+        result.type_totals = type_totals
+        result.type_counts = type_count_map
         result.platform_net_settlement = platform_net
         
         # 3. 校验
@@ -102,28 +131,27 @@ class RevenueCalculator:
         return result
     
     def _verify_result(self, result: CalculationResult):
-        """校验计算结果"""
+        """校验计算结果（先判相等，仅在不一致时才计算差额并格式化备注）"""
+        result.verification_passed = True
+        
         # 校验1: total汇总是否等于platform_net_settlement
-        total_sum = result.field_totals.get('total', Decimal('0'))
-        if abs(total_sum - result.platform_net_settlement) > Decimal('0.01'):
+        field_totals = result.field_totals
+        total_sum = field_totals.total
+        net = result.platform_net_settlement
+        if total_sum != net and abs(total_sum - net) > VERIFY_TOLERANCE:
             result.verification_passed = False
             result.verification_notes.append(
-                f"Total汇总({total_sum}) 与 平台净结算({result.platform_net_settlement}) 不一致"
+                f"Total汇总({total_sum}) 与 平台净结算({net}) 不一致"
             )
         
         # 校验2: 各字段之和是否等于total
-        # 注意: 这里的field_totals包含了total字段本身，需要排除
-        calculated_total = Decimal('0')
-        for field, value in result.field_totals.items():
-            if field != 'total':
-                calculated_total += value
-        
-        diff = total_sum - calculated_total
-        if abs(diff) > Decimal('0.01'):
-            result.verification_passed = False
-            result.verification_notes.append(
-                f"各字段汇总({calculated_total}) 与 Total({total_sum}) 存在差异: {diff}"
-            )
+        # 注意: 这里的field_totals包含了total字段本身（最后一项），需要排除
+        calculated_total = sum(field_totals[:-1], _ZERO)
         
-        if not result.verification_notes:
-            result.verification_passed = True
+        if calculated_total != total_sum:
+            diff = total_sum - calculated_total
+            if abs(diff) > VERIFY_TOLERANCE:
+                result.verification_passed = False
+                result.verification_notes.append(
+                    f"各字段汇总({calculated_total}) 与 Total({total_sum}) 存在差异: {diff}"
+                )
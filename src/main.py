@@ -9,26 +9,78 @@
 4. 多店铺聚合
 5. 导出Excel报表
 """
+import os
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.parser import AmazonCSVParser
+from src.parser.parallel_utils import map_files
 from src.calculator import RevenueCalculator, MonthlyAggregator
 from src.reporter import ExcelExporter
 from src.models import StoreMonthlyResult
 
 
+def _iter_csv_files(root: str):
+    """
+    递归列出目录下的 .csv 文件路径（os.scandir，不为每个目录项构造 Path）
+    
+    顺序与 Path.glob('**/*.csv') 一致：先当前目录的文件，再依次进入子目录
+    """
+    subdirs = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir():
+                subdirs.append(entry.path)
+            elif entry.name.endswith('.csv') and entry.is_file():
+                yield entry.path
+    for sub in subdirs:
+        yield from _iter_csv_files(sub)
+
+
+@lru_cache(maxsize=None)
+def _get_workers() -> Tuple[AmazonCSVParser, RevenueCalculator, MonthlyAggregator]:
+    """解析/核算/聚合器按进程缓存（子进程中各自创建一次）"""
+    return AmazonCSVParser(), RevenueCalculator(), MonthlyAggregator()
+
+
+def _process_one(file_path: str) -> Tuple[Optional[StoreMonthlyResult], Optional[str], List[str]]:
+    """
+    解析、核算并聚合单个CSV文件
+    
+    Returns:
+        (store_result, error, verification_notes)：解析失败时 store_result 为 None，
+        error 为错误信息；校验通过时 verification_notes 为空
+    """
+    parser, calculator, aggregator = _get_workers()
+    
+    # 解析
+    parse_result = parser.parse(file_path)
+    if not parse_result.success:
+        return None, (parse_result.errors[0] if parse_result.errors else "未知错误"), []
+    
+    # 核算
+    calc_result = calculator.calculate(
+        transactions=parse_result.transactions,
+        store_id=parse_result.store_id,
+        store_name=parse_result.store_name,
+        year_month=parse_result.year_month,
+        currency=parse_result.currency
+    )
+    notes = [] if calc_result.verification_passed else calc_result.verification_notes
+    
+    # 聚合
+    return aggregator.aggregate_store(calc_result), None, notes
+
+
 class RevenueAccountingApp:
     """收入核算系统应用"""
     
     def __init__(self):
-        self.parser = AmazonCSVParser()
-        self.calculator = RevenueCalculator()
-        self.aggregator = MonthlyAggregator()
         self.exporter = ExcelExporter()
     
     def run(self, input_dir: str, output_file: str):
@@ -43,39 +95,28 @@ class RevenueAccountingApp:
             return
         
         # 1. 扫描文件
-        files = list(input_path.glob('**/*.csv'))
-        print(f"扫描到 {len(files)} 个CSV文件")
+        paths = list(_iter_csv_files(str(input_path)))
+        print(f"扫描到 {len(paths)} 个CSV文件")
         
         store_results: List[StoreMonthlyResult] = []
         parsed_count = 0
         
-        # 2. 逐个处理
-        for f in files:
-            # 解析
-            parse_result = self.parser.parse(str(f))
-            if not parse_result.success:
-                err_msg = parse_result.errors[0] if parse_result.errors else "未知错误"
-                print(f"X 解析失败: {f.name} - {err_msg}")
+        # 2. 逐个处理（文件互相独立，数量较多时分发到多进程；结果按文件顺序汇总）
+        outcomes = map_files(_process_one, paths)
+        
+        for path, (store_result, error, notes) in zip(paths, outcomes):
+            name = os.path.basename(path)
+            if store_result is None:
+                print(f"X 解析失败: {name} - {error}")
                 continue
             
             parsed_count += 1
             
-            # 核算
-            calc_result = self.calculator.calculate(
-                transactions=parse_result.transactions,
-                store_id=parse_result.store_id,
-                store_name=parse_result.store_name,
-                year_month=parse_result.year_month,
-                currency=parse_result.currency
-            )
-            
-            if not calc_result.verification_passed:
-                print(f"! 校验警告: {f.name}")
-                for note in calc_result.verification_notes:
+            if notes:
+                print(f"! 校验警告: {name}")
+                for note in notes:
                     print(f"  - {note}")
             
-            # 聚合
-            store_result = self.aggregator.aggregate_store(calc_result)
             store_results.append(store_result)
             
             # 简单进度日志
@@ -83,7 +124,7 @@ class RevenueAccountingApp:
                   f"- 净结算: {store_result.platform_net_settlement} {store_result.currency}")
         
         print("-" * 60)
-        print(f"处理完成: {parsed_count}/{len(files)} 个文件")
+        print(f"处理完成: {parsed_count}/{len(paths)} 个文件")
         
         # 3. 导出报表
         if store_results:
@@ -4,7 +4,7 @@
 """
 from .transaction import Transaction, TransactionType
 from .store import StoreInfo, StoreMonthlyResult
-from .report import ParseResult, ParseStats, CalculationResult, ReportOutput
+from .report import ParseResult, ParseStats, FieldTotals, CalculationResult, ReportOutput
 
 __all__ = [
     'Transaction',
@@ -13,6 +13,7 @@ __all__ = [
     'StoreMonthlyResult',
     'ParseResult',
     'ParseStats',
+    'FieldTotals',
     'CalculationResult',
     'ReportOutput',
 ]
@@ -6,11 +6,36 @@
 """
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Dict, Optional, Any
-from .transaction import Transaction
+from operator import itemgetter
+from typing import List, Dict, Optional, Any, NamedTuple
+from .transaction import Transaction, _D0
 
 
-@dataclass
+class FieldTotals(NamedTuple):
+    """按字段汇总的金额（字段顺序与 Transaction 金额字段一致，total 在最后）"""
+    product_sales: Decimal = _D0
+    product_sales_tax: Decimal = _D0
+    postage_credits: Decimal = _D0
+    postage_credits_tax: Decimal = _D0
+    shipping_credits: Decimal = _D0
+    shipping_credits_tax: Decimal = _D0
+    gift_wrap_credits: Decimal = _D0
+    giftwrap_credits_tax: Decimal = _D0
+    promotional_rebates: Decimal = _D0
+    promotional_rebates_tax: Decimal = _D0
+    marketplace_withheld_tax: Decimal = _D0
+    selling_fees: Decimal = _D0
+    fba_fees: Decimal = _D0
+    other_transaction_fees: Decimal = _D0
+    other: Decimal = _D0
+    total: Decimal = _D0
+    
+    def as_dict(self) -> Dict[str, Decimal]:
+        """转换为 {字段名: 金额} 字典"""
+        return self._asdict()
+
+
+@dataclass(slots=True)
 class ParseStats:
     """解析统计信息"""
     total_rows: int = 0
@@ -26,7 +51,7 @@ class ParseStats:
     total_mismatch: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ParseResult:
     """CSV解析结果"""
     success: bool
@@ -54,7 +79,7 @@ class ParseResult:
         )
 
 
-@dataclass 
+@dataclass(slots=True)
 class CalculationResult:
     """核算计算结果"""
     # 店铺信息
@@ -63,20 +88,22 @@ class CalculationResult:
     year_month: str
     currency: str
     
-    # 交易分类
+    # 交易分类（条数始终统计；明细仅在 calculate(keep_transactions=True) 时保留）
+    included_count: int = 0
+    excluded_count: int = 0
     included_transactions: List[Transaction] = field(default_factory=list)
     excluded_transactions: List[Transaction] = field(default_factory=list)
     
     # 按字段汇总
-    field_totals: Dict[str, Decimal] = field(default_factory=dict)
+    field_totals: FieldTotals = FieldTotals()
     
     # 按Type汇总
     type_totals: Dict[str, Decimal] = field(default_factory=dict)
     type_counts: Dict[str, int] = field(default_factory=dict)
     
     # 核心结果
-    platform_net_settlement: Decimal = field(default_factory=lambda: Decimal('0'))
-    transfer_amount: Decimal = field(default_factory=lambda: Decimal('0'))
+    platform_net_settlement: Decimal = _D0
+    transfer_amount: Decimal = _D0
     
     # 校验
     verification_passed: bool = True
@@ -91,15 +118,17 @@ class CalculationResult:
             f"货币: {self.currency}",
             f"",
             f"--- 交易分类 ---",
-            f"参与计算: {len(self.included_transactions)} 条",
-            f"排除(Transfer等): {len(self.excluded_transactions)} 条",
+            f"参与计算: {self.included_count} 条",
+            f"排除(Transfer等): {self.excluded_count} 条",
             f"",
             f"--- 按Type汇总 ---",
         ]
         
-        for t, amount in sorted(self.type_totals.items(), key=lambda x: -abs(x[1])):
-            count = self.type_counts.get(t, 0)
-            lines.append(f"  {t}: {amount:,.2f} ({count}条)")
+        # 先算好 abs 作为排序键，排序时不再反复计算
+        items = [(-abs(amount), t, amount) for t, amount in self.type_totals.items()]
+        items.sort(key=itemgetter(0))
+        type_counts = self.type_counts
+        lines.extend(f"  {t}: {amount:,.2f} ({type_counts.get(t, 0)}条)" for _, t, amount in items)
         
         lines.extend([
             f"",
@@ -118,7 +147,7 @@ class CalculationResult:
         return '\n'.join(lines)
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportOutput:
     """报表输出结果"""
     success: bool
@@ -133,6 +162,6 @@ class ReportOutput:
     
     # 汇总
     total_stores: int = 0
-    total_platform_net_settlement: Decimal = field(default_factory=lambda: Decimal('0'))
+    total_platform_net_settlement: Decimal = _D0
     
     message: str = ""
@@ -4,17 +4,55 @@
 
 包含店铺信息和月度核算结果
 """
-from dataclasses import dataclass, field
+import re
+from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional
+from operator import attrgetter
+from typing import List, Optional
+
+from .transaction import _Q2, _D0
+
+
+# 文件名解析正则（from_filename 使用，模块加载时编译一次）
+# 1) 店铺名在前、站点在后，允许中间有空格（如 账号12 de 2025）
+_STORE_THEN_SITE_RE = re.compile(
+    r'^(.+?)[-_\s]+(UK|DE|US|CA|FR|IT|ES|JP|AU)(?:\s|_|-|\d|$)', re.IGNORECASE
+)
+# 2) 站点在前、店铺名在后：UK 2025Apr..., DE_2025Apr...
+_SITE_THEN_STORE_RE = re.compile(r'^(UK|DE|US|CA|FR|IT|ES|JP|AU)[-_\s]+(.+)$', re.IGNORECASE)
+# 3) 无显式站点的 MonthlyUnifiedTransaction 账单
+_UNIFIED_RE = re.compile(
+    r'\d{4}(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)MonthlyUnifiedTransaction', re.IGNORECASE
+)
+
+
+# 报表行字段：前 5 列原样输出，后 5 列金额转 float
+_REPORT_HEAD_ATTRS = attrgetter('store_name', 'marketplace', 'year_month', 'currency', 'total_records')
+_REPORT_AMOUNT_ATTRS = attrgetter(
+    'gross_sales', 'platform_fees', 'promotional_rebates', 'platform_net_settlement', 'transfer_amount'
+)
+
+# to_dict 字段：原样输出 / 金额转 float / Phase 2 可选金额
+_DICT_PLAIN_FIELDS = (
+    'store_id', 'store_name', 'platform', 'marketplace', 'year_month', 'currency',
+    'total_records', 'included_records', 'excluded_records',
+)
+_DICT_AMOUNT_FIELDS = (
+    'gross_sales', 'platform_fees', 'promotional_rebates', 'adjustments', 'taxes', 'other',
+    'platform_net_settlement', 'transfer_amount',
+)
+_DICT_OPTIONAL_FIELDS = ('warehouse_cost', 'procurement_cost', 'gross_profit')
+_DICT_PLAIN_ATTRS = attrgetter(*_DICT_PLAIN_FIELDS)
+_DICT_AMOUNT_ATTRS = attrgetter(*_DICT_AMOUNT_FIELDS)
+_DICT_OPTIONAL_ATTRS = attrgetter(*_DICT_OPTIONAL_FIELDS)
 
 
 def _quantize(value: Decimal) -> Decimal:
     """保留2位小数"""
-    return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return value.quantize(_Q2, rounding=ROUND_HALF_UP)
 
 
-@dataclass
+@dataclass(slots=True)
 class StoreInfo:
     """店铺基本信息"""
     store_id: str
@@ -39,36 +77,25 @@ class StoreInfo:
         - 店铺名-站点 / 店铺名_站点: 4-DE2025Jul..., 账号4-uk 2025..., 智能万物店铺10_UK 2025Nov...
         - 站点-店铺名 / 站点 店铺名: UK 2025Apr..., DE_2025Apr...
         """
-        import re
-
         base = filename.split('.')[0]
         store_name = base
         marketplace = ""
 
         # 1) 店铺名在前、站点在后：(.+?)[-_\s]*(UK|DE|US|...)，允许中间有空格（如 账号12 de 2025）
-        match = re.match(
-            r'^(.+?)[-_\s]+(UK|DE|US|CA|FR|IT|ES|JP|AU)(?:\s|_|-|\d|$)',
-            base,
-            re.IGNORECASE,
-        )
+        match = _STORE_THEN_SITE_RE.match(base)
         if match:
             store_name = match.group(1).strip()
             marketplace = match.group(2).upper()
         else:
             # 2) 站点在前、店铺名在后：UK 2025Apr..., DE_2025Apr...
-            match2 = re.match(
-                r'^(UK|DE|US|CA|FR|IT|ES|JP|AU)[-_\s]+(.+)$',
-                base,
-                re.IGNORECASE,
-            )
+            match2 = _SITE_THEN_STORE_RE.match(base)
             if match2:
                 marketplace = match2.group(1).upper()
                 store_name = match2.group(2).strip()
             else:
                 # 3) 无显式站点且是 MonthlyUnifiedTransaction，默认视为北美 US 账单
                 #    示例: 2025AprMonthlyUnifiedTransaction.csv
-                unified_pat = r'\d{4}(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)MonthlyUnifiedTransaction'
-                if re.search(unified_pat, base, re.IGNORECASE):
+                if _UNIFIED_RE.search(base):
                     marketplace = "US"
 
         store_id = f"{store_name}_{marketplace}".lower().replace(' ', '_') if marketplace else store_name.lower().replace(' ', '_')
@@ -83,7 +110,7 @@ class StoreInfo:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class StoreMonthlyResult:
     """
     店铺月度核算结果
@@ -104,18 +131,18 @@ class StoreMonthlyResult:
     excluded_records: int = 0
     
     # 收入明细
-    gross_sales: Decimal = field(default_factory=lambda: Decimal('0'))
-    platform_fees: Decimal = field(default_factory=lambda: Decimal('0'))
-    promotional_rebates: Decimal = field(default_factory=lambda: Decimal('0'))
-    adjustments: Decimal = field(default_factory=lambda: Decimal('0'))
-    taxes: Decimal = field(default_factory=lambda: Decimal('0'))
-    other: Decimal = field(default_factory=lambda: Decimal('0'))
+    gross_sales: Decimal = _D0
+    platform_fees: Decimal = _D0
+    promotional_rebates: Decimal = _D0
+    adjustments: Decimal = _D0
+    taxes: Decimal = _D0
+    other: Decimal = _D0
     
     # 核心指标: 月度平台净结算金额
-    platform_net_settlement: Decimal = field(default_factory=lambda: Decimal('0'))
+    platform_net_settlement: Decimal = _D0
     
     # 排除项统计 (仅展示，不参与计算)
-    transfer_amount: Decimal = field(default_factory=lambda: Decimal('0'))
+    transfer_amount: Decimal = _D0
     
     # Phase 2 预留
     warehouse_cost: Optional[Decimal] = None
@@ -147,43 +174,23 @@ class StoreMonthlyResult:
     
     def to_dict(self) -> dict:
         """转换为字典"""
-        return {
-            'store_id': self.store_id,
-            'store_name': self.store_name,
-            'platform': self.platform,
-            'marketplace': self.marketplace,
-            'year_month': self.year_month,
-            'currency': self.currency,
-            'total_records': self.total_records,
-            'included_records': self.included_records,
-            'excluded_records': self.excluded_records,
-            'gross_sales': float(self.gross_sales),
-            'platform_fees': float(self.platform_fees),
-            'promotional_rebates': float(self.promotional_rebates),
-            'adjustments': float(self.adjustments),
-            'taxes': float(self.taxes),
-            'other': float(self.other),
-            'platform_net_settlement': float(self.platform_net_settlement),
-            'transfer_amount': float(self.transfer_amount),
-            # Phase 2
-            'warehouse_cost': float(self.warehouse_cost) if self.warehouse_cost else None,
-            'procurement_cost': float(self.procurement_cost) if self.procurement_cost else None,
-            'gross_profit': float(self.gross_profit) if self.gross_profit else None,
-        }
+        d = dict(zip(_DICT_PLAIN_FIELDS, _DICT_PLAIN_ATTRS(self)))
+        d.update(zip(_DICT_AMOUNT_FIELDS, map(float, _DICT_AMOUNT_ATTRS(self))))
+        # Phase 2（未填写或为 0 时输出 None）
+        for name, value in zip(_DICT_OPTIONAL_FIELDS, _DICT_OPTIONAL_ATTRS(self)):
+            d[name] = float(value) if value else None
+        return d
     
     def to_report_row(self) -> list:
         """转换为报表行"""
+        return [*_REPORT_HEAD_ATTRS(self), *map(float, _REPORT_AMOUNT_ATTRS(self))]
+    
+    @staticmethod
+    def build_report_rows(results: List['StoreMonthlyResult']) -> List[list]:
+        """批量转换为报表行（与逐个调用 to_report_row 结果一致）"""
         return [
-            self.store_name,
-            self.marketplace,
-            self.year_month,
-            self.currency,
-            self.total_records,
-            float(self.gross_sales),
-            float(self.platform_fees),
-            float(self.promotional_rebates),
-            float(self.platform_net_settlement),
-            float(self.transfer_amount),
+            [*_REPORT_HEAD_ATTRS(r), *map(float, _REPORT_AMOUNT_ATTRS(r))]
+            for r in results
         ]
     
     @staticmethod
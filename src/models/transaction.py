@@ -4,11 +4,22 @@
 
 核心模型，表示平台CSV中的单条交易记录
 """
-from dataclasses import dataclass, field
+import json
+import sys
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from operator import attrgetter
+from typing import Iterable, Optional
+
+# orjson 可选：安装后 to_json 使用 C 实现序列化，未安装时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 class TransactionType(Enum):
@@ -30,46 +41,93 @@ class TransactionType(Enum):
         if not value:
             return cls.OTHER
         
-        value_lower = value.strip().lower()
-        
-        # 精确匹配
-        for t in cls:
-            if t.value.lower() == value_lower:
-                return t
-        
-        # 变体匹配
-        if 'transfer' in value_lower:
-            return cls.TRANSFER
-        if 'payout' in value_lower:
-            return cls.PAYOUT
-        if 'refund' in value_lower:
-            return cls.REFUND
-        if 'order' in value_lower:
-            return cls.ORDER
-        if 'service' in value_lower and 'fee' in value_lower:
-            return cls.SERVICE_FEE
-        if 'fba' in value_lower and ('inventory' in value_lower or 'fee' in value_lower):
-            return cls.FBA_INVENTORY_FEE
-        if 'adjustment' in value_lower:
-            return cls.ADJUSTMENT
-        if 'liquidation' in value_lower:
-            return cls.LIQUIDATIONS
-        if 'amazon' in value_lower and 'fee' in value_lower:
-            return cls.AMAZON_FEES
-        
-        return cls.OTHER
+        # 原样等于某个 value（平台导出的常见情形）时直接命中，免去 strip/lower
+        hit = _TYPE_BY_VALUE.get(value)
+        if hit is not None:
+            return hit
+        return _match_transaction_type(value.strip().lower())
     
     def is_excluded_from_revenue(self) -> bool:
         """是否从收入计算中排除"""
-        return self in (TransactionType.TRANSFER, TransactionType.PAYOUT)
+        return self.code in _EXCLUDED_TYPE_CODES
+
+
+# 整数编码（按定义顺序 0..N-1），统计时直接作为列表下标，避免按字符串/成员哈希；
+# 类定义完成后按成员顺序显式赋值，不依赖 Enum 构建过程中 __members__ 的填充方式
+for _code, _type in enumerate(TransactionType):
+    _type.code = _code
+del _code, _type
+
+# 从收入计算中排除的类型 (Transfer/Payout) 的整数编码
+_EXCLUDED_TYPE_CODES = frozenset((TransactionType.TRANSFER.code, TransactionType.PAYOUT.code))
+
+# value -> 成员，用于 from_string 原样精确匹配
+_TYPE_BY_VALUE = {t.value: t for t in TransactionType}
+
+# 小写 value -> 成员，用于 from_string 精确匹配
+_TYPE_BY_LOWER = {t.value.lower(): t for t in TransactionType}
+
+# 变体匹配规则：(需全部出现的关键词, 类型)，按顺序取第一个命中
+_TYPE_VARIANTS = (
+    (('transfer',), TransactionType.TRANSFER),
+    (('payout',), TransactionType.PAYOUT),
+    (('refund',), TransactionType.REFUND),
+    (('order',), TransactionType.ORDER),
+    (('service', 'fee'), TransactionType.SERVICE_FEE),
+    (('fba', 'inventory'), TransactionType.FBA_INVENTORY_FEE),
+    (('fba', 'fee'), TransactionType.FBA_INVENTORY_FEE),
+    (('adjustment',), TransactionType.ADJUSTMENT),
+    (('liquidation',), TransactionType.LIQUIDATIONS),
+    (('amazon', 'fee'), TransactionType.AMAZON_FEES),
+)
+
+
+@lru_cache(maxsize=512)
+def _match_transaction_type(value_lower: str) -> TransactionType:
+    """按已规范化（strip + lower）的字符串匹配交易类型；取值种类很少，结果缓存"""
+    # 精确匹配
+    hit = _TYPE_BY_LOWER.get(value_lower)
+    if hit is not None:
+        return hit
+    
+    # 变体匹配（按优先级，关键词需全部出现）
+    for keywords, t in _TYPE_VARIANTS:
+        if all(k in value_lower for k in keywords):
+            return t
+    
+    return TransactionType.OTHER
+
+
+# Transaction.to_dict 输出字段（按输出顺序分组）
+_DICT_TEXT_FIELDS = ('settlement_id', 'type', 'type_raw', 'order_id', 'sku', 'description')
+_DICT_AMOUNT_FIELDS = (
+    'product_sales', 'selling_fees', 'fba_fees', 'other_transaction_fees', 'other', 'total',
+    'platform_net_settlement', 'calculated_total',
+)
+_DICT_META_FIELDS = ('store_id', 'currency', 'source_file', 'row_number')
+_DICT_TEXT_ATTRS = attrgetter(
+    'settlement_id', 'type.value', 'type_raw', 'order_id', 'sku', 'description'
+)
+_DICT_AMOUNT_ATTRS = attrgetter(*_DICT_AMOUNT_FIELDS)
+_DICT_META_ATTRS = attrgetter(*_DICT_META_FIELDS)
+
+
+# 金额精度与零值常量（Decimal 不可变，可安全共享为字段默认值）
+_Q2 = Decimal('0.01')
+_D0 = Decimal('0')
+
+
+def _intern(value):
+    """驻留重复率高的短字符串（币种、平台、仓库名、来源文件等），相同取值的记录共享同一对象"""
+    return sys.intern(value) if type(value) is str else value
 
 
 def _quantize(value: Decimal) -> Decimal:
     """保留2位小数"""
-    return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return value.quantize(_Q2, rounding=ROUND_HALF_UP)
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     """
     交易记录模型
@@ -86,26 +144,26 @@ class Transaction:
     description: str = ""
     
     # 收入类字段 (通常为正)
-    product_sales: Decimal = field(default_factory=lambda: Decimal('0'))
-    product_sales_tax: Decimal = field(default_factory=lambda: Decimal('0'))
-    postage_credits: Decimal = field(default_factory=lambda: Decimal('0'))
-    postage_credits_tax: Decimal = field(default_factory=lambda: Decimal('0'))
-    shipping_credits: Decimal = field(default_factory=lambda: Decimal('0'))
-    shipping_credits_tax: Decimal = field(default_factory=lambda: Decimal('0'))
-    gift_wrap_credits: Decimal = field(default_factory=lambda: Decimal('0'))
-    giftwrap_credits_tax: Decimal = field(default_factory=lambda: Decimal('0'))
+    product_sales: Decimal = _D0
+    product_sales_tax: Decimal = _D0
+    postage_credits: Decimal = _D0
+    postage_credits_tax: Decimal = _D0
+    shipping_credits: Decimal = _D0
+    shipping_credits_tax: Decimal = _D0
+    gift_wrap_credits: Decimal = _D0
+    giftwrap_credits_tax: Decimal = _D0
     
     # 扣减类字段 (通常为负)
-    promotional_rebates: Decimal = field(default_factory=lambda: Decimal('0'))
-    promotional_rebates_tax: Decimal = field(default_factory=lambda: Decimal('0'))
-    marketplace_withheld_tax: Decimal = field(default_factory=lambda: Decimal('0'))
-    selling_fees: Decimal = field(default_factory=lambda: Decimal('0'))
-    fba_fees: Decimal = field(default_factory=lambda: Decimal('0'))
-    other_transaction_fees: Decimal = field(default_factory=lambda: Decimal('0'))
-    other: Decimal = field(default_factory=lambda: Decimal('0'))
+    promotional_rebates: Decimal = _D0
+    promotional_rebates_tax: Decimal = _D0
+    marketplace_withheld_tax: Decimal = _D0
+    selling_fees: Decimal = _D0
+    fba_fees: Decimal = _D0
+    other_transaction_fees: Decimal = _D0
+    other: Decimal = _D0
     
     # 核心字段: 平台净结算金额
-    total: Decimal = field(default_factory=lambda: Decimal('0'))
+    total: Decimal = _D0
     
     # 元数据
     platform: str = "amazon"
@@ -115,11 +173,24 @@ class Transaction:
     source_file: str = ""
     row_number: int = 0
     
+    def __post_init__(self):
+        """逐行创建的记录大量重复这些字符串，驻留后共享同一对象"""
+        self.type_raw = _intern(self.type_raw)
+        self.platform = _intern(self.platform)
+        self.store_name = _intern(self.store_name)
+        self.currency = _intern(self.currency)
+        self.source_file = _intern(self.source_file)
+    
     @property
     def platform_net_settlement(self) -> Decimal:
         """平台净结算金额 (核心字段，等价于total)"""
         return _quantize(self.total)
     
+    @property
+    def platform_net_cents(self) -> int:
+        """平台净结算金额（分，整数），供批量累加使用"""
+        return int(_quantize(self.total).scaleb(2))
+    
     @property
     def calculated_total(self) -> Decimal:
         """根据各字段计算的total，用于校验"""
@@ -139,7 +210,7 @@ class Transaction:
         """total字段与计算值的差异"""
         return _quantize(self.total - self.calculated_total)
     
-    def is_total_verified(self, tolerance: Decimal = Decimal('0.01')) -> bool:
+    def is_total_verified(self, tolerance: Decimal = _Q2) -> bool:
         """校验total是否与各字段之和一致"""
         return abs(self.total_verification_diff) <= tolerance
     
@@ -173,26 +244,26 @@ class Transaction:
         )
     
     def to_dict(self) -> dict:
-        """转换为字典"""
-        return {
-            'date_time': self.date_time.isoformat() if self.date_time else None,
-            'settlement_id': self.settlement_id,
-            'type': self.type.value,
-            'type_raw': self.type_raw,
-            'order_id': self.order_id,
-            'sku': self.sku,
-            'description': self.description,
-            'product_sales': float(self.product_sales),
-            'selling_fees': float(self.selling_fees),
-            'fba_fees': float(self.fba_fees),
-            'other_transaction_fees': float(self.other_transaction_fees),
-            'other': float(self.other),
-            'total': float(self.total),
-            'platform_net_settlement': float(self.platform_net_settlement),
-            'calculated_total': float(self.calculated_total),
-            'is_excluded': self.is_excluded_from_revenue(),
-            'store_id': self.store_id,
-            'currency': self.currency,
-            'source_file': self.source_file,
-            'row_number': self.row_number,
-        }
+        """转换为字典（派生金额各取一次，金额列统一 map(float) 转换）"""
+        d = {'date_time': self.date_time.isoformat() if self.date_time else None}
+        d.update(zip(_DICT_TEXT_FIELDS, _DICT_TEXT_ATTRS(self)))
+        d.update(zip(_DICT_AMOUNT_FIELDS, map(float, _DICT_AMOUNT_ATTRS(self))))
+        d['is_excluded'] = self.is_excluded_from_revenue()
+        d.update(zip(_DICT_META_FIELDS, _DICT_META_ATTRS(self)))
+        return d
+    
+    def to_json(self) -> bytes:
+        """转换为 UTF-8 编码的 JSON（内容与 to_dict 一致）"""
+        return _dumps_json(self.to_dict())
+    
+    @staticmethod
+    def batch_to_json(transactions: Iterable['Transaction']) -> bytes:
+        """批量转换为 JSON 数组，整批一次序列化"""
+        return _dumps_json([t.to_dict() for t in transactions])
+
+
+def _dumps_json(obj) -> bytes:
+    """序列化为紧凑 UTF-8 JSON：优先 orjson，否则使用标准库 json（输出格式一致）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
@@ -4,12 +4,16 @@
 
 Phase 2.1: 仅负责数据建模，不做成本分摊
 """
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
+from .transaction import _Q2, _D0, _intern
+
 
 class CostType(Enum):
     """成本类型枚举"""
@@ -28,48 +32,57 @@ class CostType(Enum):
     @classmethod
     def from_string(cls, type_str: str) -> 'CostType':
         """根据字符串推断成本类型"""
-        type_str = str(type_str).lower()
-        
-        # 派送/发货
-        if any(k in type_str for k in ['派送', 'delivery', 'shipping', '运费', 'dispatch']):
-            return cls.SHIPPING
-        # 仓储
-        if any(k in type_str for k in ['仓储', 'storage', '仓租', 'rent']):
-            return cls.STORAGE
-        # 入库
-        if any(k in type_str for k in ['入库', 'inbound', 'receiving', 'good in']):
-            return cls.INBOUND
-        # 出库
-        if any(k in type_str for k in ['出库', 'outbound', 'fulfil', 'pick']):
-            return cls.OUTBOUND
-        # 操作费
-        if any(k in type_str for k in ['操作', 'handling', 'process', 'labour']):
-            return cls.HANDLING
-        # 包装
-        if any(k in type_str for k in ['包装', 'packag', 'box', 'carton']):
-            return cls.PACKAGING
-        # 退货
-        if any(k in type_str for k in ['退货', 'return', 'rts']):
-            return cls.RETURN
-        # 管理费
-        if any(k in type_str for k in ['管理', 'management', 'account', 'admin']):
-            return cls.MANAGEMENT
-        # 头程
-        if any(k in type_str for k in ['头程', 'freight', 'sea freight', 'air freight']):
-            return cls.TRANSPORT
-        # 清关
-        if any(k in type_str for k in ['清关', 'customs', 'duty', 'vat']):
-            return cls.CUSTOMS
-        
-        return cls.OTHER
+        return _match_cost_type(str(type_str).lower())
+
+
+# 成本类型关键词：按优先级排列，取第一个命中的类型
+_COST_TYPE_KEYWORDS = (
+    (('派送', 'delivery', 'shipping', '运费', 'dispatch'), CostType.SHIPPING),      # 派送/发货
+    (('仓储', 'storage', '仓租', 'rent'), CostType.STORAGE),                        # 仓储
+    (('入库', 'inbound', 'receiving', 'good in'), CostType.INBOUND),               # 入库
+    (('出库', 'outbound', 'fulfil', 'pick'), CostType.OUTBOUND),                   # 出库
+    (('操作', 'handling', 'process', 'labour'), CostType.HANDLING),                # 操作费
+    (('包装', 'packag', 'box', 'carton'), CostType.PACKAGING),                     # 包装
+    (('退货', 'return', 'rts'), CostType.RETURN),                                  # 退货
+    (('管理', 'management', 'account', 'admin'), CostType.MANAGEMENT),             # 管理费
+    (('头程', 'freight', 'sea freight', 'air freight'), CostType.TRANSPORT),        # 头程
+    (('清关', 'customs', 'duty', 'vat'), CostType.CUSTOMS),                        # 清关
+)
+
+# 关键词 -> 优先级（_COST_TYPE_KEYWORDS 下标）
+_COST_KEYWORD_PRIORITY = {}
+for _i, (_keywords, _) in enumerate(_COST_TYPE_KEYWORDS):
+    for _k in _keywords:
+        _COST_KEYWORD_PRIORITY.setdefault(_k, _i)
+
+# 所有关键词合成一个正则；零宽前瞻使每个位置都参与匹配（关键词可重叠），
+# 同一位置按优先级顺序尝试，保证结果与逐组 `in` 判断一致
+_COST_TYPE_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in _COST_KEYWORD_PRIORITY) + '))'
+)
+
+
+@lru_cache(maxsize=512)
+def _match_cost_type(type_str: str) -> CostType:
+    """按小写字符串匹配成本类型；费用描述种类有限，结果缓存"""
+    # 一次扫描找出所有命中的关键词，取优先级最高的类型
+    best = None
+    for m in _COST_TYPE_RE.finditer(type_str):
+        priority = _COST_KEYWORD_PRIORITY[m.group(1)]
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
+    
+    return CostType.OTHER if best is None else _COST_TYPE_KEYWORDS[best][1]
 
 
 def _quantize(value: Decimal) -> Decimal:
     """保留2位小数"""
-    return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return value.quantize(_Q2, rounding=ROUND_HALF_UP)
 
 
-@dataclass
+@dataclass(slots=True)
 class WarehouseCost:
     """
     标准仓库成本模型
@@ -88,7 +101,7 @@ class WarehouseCost:
     store_id: str = ""              # 店铺ID (如有)
     
     # 成本信息
-    cost_amount: Decimal = field(default_factory=lambda: Decimal('0'))
+    cost_amount: Decimal = _D0
     currency: str = "USD"           # 币种
     cost_type: CostType = CostType.OTHER
     cost_type_raw: str = ""         # 原始费用类型描述
@@ -99,7 +112,7 @@ class WarehouseCost:
     
     # 数量 (如有)
     quantity: int = 0               # 数量
-    weight: Decimal = field(default_factory=lambda: Decimal('0'))  # 重量
+    weight: Decimal = _D0  # 重量
     
     # 来源
     source_file: str = ""           # 源文件
@@ -107,6 +120,11 @@ class WarehouseCost:
     
     def __post_init__(self):
         """初始化后处理"""
+        self.warehouse_name = _intern(self.warehouse_name)
+        self.currency = _intern(self.currency)
+        self.cost_type_raw = _intern(self.cost_type_raw)
+        self.billing_period = _intern(self.billing_period)
+        self.source_file = _intern(self.source_file)
         if isinstance(self.cost_amount, (int, float, str)):
             self.cost_amount = _quantize(Decimal(str(self.cost_amount)))
         if isinstance(self.weight, (int, float, str)):
@@ -118,7 +136,7 @@ class WarehouseCost:
         if self.billing_period:
             return self.billing_period
         if self.cost_date:
-            return self.cost_date.strftime('%Y-%m')
+            return f"{self.cost_date.year}-{self.cost_date.month:02d}"
         return ""
     
     def to_dict(self) -> dict:
@@ -140,14 +158,14 @@ class WarehouseCost:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class WarehouseBillingSummary:
     """仓库账单汇总"""
     warehouse_name: str
     billing_period: str
     currency: str
     
-    total_cost: Decimal = field(default_factory=lambda: Decimal('0'))
+    total_cost: Decimal = _D0
     cost_by_type: dict = field(default_factory=dict)
     record_count: int = 0
     
@@ -5,4 +5,12 @@ CSV解析器模块
 from .amazon_parser import AmazonCSVParser
 from .base_parser import BaseParser
 
-__all__ = ['AmazonCSVParser', 'BaseParser']
+__all__ = ['AmazonCSVParser', 'BaseParser', 'AliExpressParser']
+
+
+def __getattr__(name):
+    # AliExpressParser 依赖 openpyxl（Excel 读取），按需导入，避免只用 Amazon CSV 解析时也加载
+    if name == 'AliExpressParser':
+        from .aliexpress_parser import AliExpressParser
+        return AliExpressParser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,16 +4,21 @@
 
 解析 收支流水xxx.xlsx 文件
 """
+import numpy as np
 import pandas as pd
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 import re
 import sys
 
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+# 仅在项目根目录不在 sys.path 时插入（直接运行本文件时需要），避免重复导入时反复插入
+_PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 from src.models import Transaction, TransactionType
+from src.parser.excel_utils import EXCEL_ENGINE
 
 
 class AliExpressParser:
@@ -22,6 +27,20 @@ class AliExpressParser:
     # 排除的交易类型 (提现)
     EXCLUDED_TYPES = ['提现', '出金']
     
+    # 预编译：提现类型匹配
+    _EXCLUDE_RE = re.compile('|'.join(map(re.escape, EXCLUDED_TYPES)))
+    # 金额中需去除的币种符号、千分位和空白字符（与正则 [CN￥¥\s,] 等价；
+    # Unicode 空白字符码位不超过 U+3000 全角空格）
+    _AMOUNT_STRIP_TABLE = str.maketrans('', '', 'CN￥¥,' + ''.join(
+        c for c in map(chr, range(0x3001)) if c.isspace()
+    ))
+    
+    # 结算时间的标准格式
+    TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+    
+    # 解析用到的列，其余列不读取
+    USED_COLUMNS = frozenset(['收支类型', '费用项', '变动金额', '结算时间', '订单号', '币种'])
+    
     def __init__(self):
         self.platform = 'aliexpress'
     
@@ -33,71 +52,64 @@ class AliExpressParser:
         if not file_path.exists():
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
-        transactions = []
-        all_months = set()
-        
         try:
-            df = pd.read_excel(file_path)
+            # 只读用到的列；统一按字符串读取，跳过类型推断，
+            # 长订单号也不会被转成浮点/科学计数法
+            df = pd.read_excel(
+                file_path, engine=EXCEL_ENGINE,
+                usecols=lambda c: c in self.USED_COLUMNS, dtype=str,
+            )
         except Exception as e:
             return [], {'error': str(e)}
         
         if df.empty:
             return [], {'error': '空文件'}
         
-        for idx, row in df.iterrows():
-            try:
-                # 检查是否为提现类型 - 排除
-                income_type = str(row.get('收支类型', '')).strip()
-                fee_type = str(row.get('费用项', '')).strip()
-                
-                is_transfer = any(t in income_type for t in self.EXCLUDED_TYPES) or \
-                              any(t in fee_type for t in self.EXCLUDED_TYPES)
-                
-                # 解析金额 - 需要去除 "CN￥ " 前缀
-                amount_str = str(row.get('变动金额', '0')).strip()
-                amount_str = re.sub(r'[CN￥¥\s,]', '', amount_str)
-                
-                if not amount_str:
-                    continue
-                    
-                amount = Decimal(amount_str)
-                
-                # 解析时间
-                date_time = None
-                time_val = row.get('结算时间')
-                if time_val and not pd.isna(time_val):
-                    try:
-                        if isinstance(time_val, str):
-                            date_time = datetime.strptime(time_val, '%Y-%m-%d %H:%M:%S')
-                        else:
-                            date_time = pd.to_datetime(time_val)
-                    except:
-                        pass
-                
-                if date_time:
-                    all_months.add(date_time.strftime('%Y-%m'))
-                
-                # 确定交易类型
-                txn_type = TransactionType.TRANSFER if is_transfer else \
-                           TransactionType.REFUND if '退款' in income_type else \
-                           TransactionType.ORDER
-                
-                txn = Transaction(
-                    date_time=date_time,
-                    type=txn_type,
-                    type_raw=fee_type,
-                    order_id=str(row.get('订单号', '')).strip() if row.get('订单号') else '',
-                    total=amount,
-                    platform=self.platform,
-                    store_name='速卖通',
-                    currency=str(row.get('币种', 'CNY')).strip(),
-                    source_file=str(file_path),
-                    row_number=idx + 2,
-                )
-                transactions.append(txn)
-                
-            except Exception as e:
-                continue
+        # 列级预处理（缺失列按原 row.get 默认值补齐），逐行只负责构造 Transaction
+        income_types = self._str_column(df, '收支类型', '')
+        fee_types = self._str_column(df, '费用项', '')
+        amount_strs = [a.translate(self._AMOUNT_STRIP_TABLE) for a in self._str_column(df, '变动金额', '0')]
+        currencies = self._str_column(df, '币种', 'CNY')
+        
+        # 提现类型 - 排除
+        is_transfer = (
+            income_types.str.contains(self._EXCLUDE_RE)
+            | fee_types.str.contains(self._EXCLUDE_RE)
+        ).to_numpy()
+        is_refund = income_types.str.contains('退款', regex=False).to_numpy()
+        # 确定交易类型：提现优先，其次退款，其余为订单
+        txn_types = np.where(
+            is_transfer, TransactionType.TRANSFER,
+            np.where(is_refund, TransactionType.REFUND, TransactionType.ORDER),
+        ).tolist()
+        
+        # 金额无法解析（空值/非数字）的行先过滤掉，构造交易时不再需要异常处理
+        amounts = [self._parse_amount(a) for a in amount_strs]
+        kept = [i for i, amount in enumerate(amounts) if amount is not None]
+        
+        time_vals = self._column(df, '结算时间', None)
+        date_times = self._parse_times([time_vals[i] for i in kept])
+        all_months = {f"{y}-{m:02d}" for y, m in {(dt.year, dt.month) for dt in date_times if dt}}
+        
+        order_vals = self._column(df, '订单号', '')
+        row_numbers = (df.index + 2).tolist()
+        source_file = str(file_path)
+        
+        transactions = [
+            Transaction(
+                date_time=date_time,
+                type=txn_types[i],
+                type_raw=fee_types[i],
+                order_id=str(order_vals[i]).strip() if order_vals[i] else '',
+                total=amounts[i],
+                platform=self.platform,
+                store_name='速卖通',
+                currency=currencies[i],
+                source_file=source_file,
+                row_number=row_numbers[i],
+            )
+            for i, date_time in zip(kept, date_times)
+        ]
         
         meta = {
             'platform': self.platform,
@@ -110,6 +122,60 @@ class AliExpressParser:
         }
         
         return transactions, meta
+    
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, default) -> list:
+        """取整列原始值（Python 对象）；列不存在时整列为 default"""
+        if name in df.columns:
+            return df[name].tolist()
+        return [default] * len(df)
+    
+    @classmethod
+    def _str_column(cls, df: pd.DataFrame, name: str, default) -> pd.Series:
+        """整列按 str(v).strip() 转为字符串（缺失值为 'nan'，与逐行 str() 一致）"""
+        return pd.Series(
+            [str(v).strip() for v in cls._column(df, name, default)], dtype=object
+        )
+    
+    @staticmethod
+    def _parse_amount(amount_str: str) -> Optional[Decimal]:
+        """解析已清洗的金额字符串，空串或非法值返回 None"""
+        if not amount_str:
+            return None
+        # 常见的纯数字金额（可带负号、一个小数点）直接构造，不进入异常处理
+        digits = (amount_str[1:] if amount_str[0] == '-' else amount_str).replace('.', '', 1)
+        if digits.isascii() and digits.isdigit():
+            return Decimal(amount_str)
+        try:
+            return Decimal(amount_str)
+        except InvalidOperation:
+            return None
+    
+    @classmethod
+    def _parse_times(cls, time_vals: list) -> list:
+        """
+        整列解析结算时间：先按标准格式向量化解析，
+        未命中的非空值（其他格式/非字符串）再逐个走 _parse_time
+        """
+        parsed = pd.to_datetime(
+            pd.Series(time_vals, dtype=object), format=cls.TIME_FORMAT, errors='coerce'
+        )
+        return [
+            dt if dt is not pd.NaT else cls._parse_time(v)
+            for v, dt in zip(time_vals, parsed.dt.to_pydatetime())
+        ]
+    
+    @staticmethod
+    def _parse_time(time_val):
+        """解析结算时间，无法解析时返回 None"""
+        if time_val and not pd.isna(time_val):
+            try:
+                if isinstance(time_val, str):
+                    return datetime.strptime(time_val, AliExpressParser.TIME_FORMAT)
+                return pd.to_datetime(time_val)
+            except Exception:
+                pass
+        return None
 
 
 # 测试
@@ -126,8 +192,8 @@ if __name__ == '__main__':
         included = [t for t in txns if not t.is_excluded_from_revenue()]
         excluded = [t for t in txns if t.is_excluded_from_revenue()]
         
-        net = sum(t.total for t in included)
-        transfers = sum(t.total for t in excluded)
+        net = sum((t.total for t in included), Decimal('0'))
+        transfers = sum((t.total for t in excluded), Decimal('0'))
         
         print(f"参与计算: {len(included)} 条")
         print(f"排除(Transfer): {len(excluded)} 条")
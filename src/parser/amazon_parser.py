@@ -8,15 +8,20 @@ Amazon CSV 解析器
 - total字段校验
 - Transfer/Payout识别
 """
+import codecs
 import csv
-import io
 import re
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Iterable, Optional, List, TextIO, Tuple
 import sys
 
+import numpy as np
+import pandas as pd
+
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.models import (
@@ -24,6 +29,10 @@ from src.models import (
     StoreInfo, ParseResult, ParseStats
 )
 from src.parser.base_parser import BaseParser
+from src.parser.parallel_utils import map_files
+
+_ZERO = Decimal('0')
+_CENT = Decimal('0.01')
 
 
 class AmazonCSVParser(BaseParser):
@@ -37,6 +46,58 @@ class AmazonCSVParser(BaseParser):
         'jp': ['トランザクションの種類', '商品の売上', '合計'],
     }
     
+    # 按 LANG_MARKERS 的语言顺序检测；各语言的标记按长度降序排列，便于尽早短路
+    _LANG_MARKERS_ORDERED = tuple(
+        (lang, tuple(sorted(markers, key=len, reverse=True)))
+        for lang, markers in LANG_MARKERS.items()
+    )
+    
+    # 所有语言标记的并集：一行不含任何标记时不可能是表头，一次搜索即可跳过说明行
+    _ANY_LANG_MARKER_RE = re.compile(
+        '|'.join(re.escape(m) for m in sorted(
+            {m for markers in LANG_MARKERS.values() for m in markers}, key=len, reverse=True
+        ))
+    )
+    
+    # 多语言交易类型关键词 -> 英文类型；按顺序判断，取第一个命中的规则
+    TYPE_KEYWORDS = {
+        'de': (
+            (('bestellung',), 'Order'),
+            (('erstattung',), 'Refund'),
+            (('übertrag', 'transfer'), 'Transfer'),
+            (('servicegebühr',), 'Service Fee'),
+            (('anpassung',), 'Adjustment'),
+        ),
+        'fr': (
+            (('commande',), 'Order'),
+            (('remboursement',), 'Refund'),
+            (('transfert',), 'Transfer'),
+            (('frais de service',), 'Service Fee'),
+            (('ajustement',), 'Adjustment'),
+        ),
+        'jp': (
+            (('注文',), 'Order'),
+            (('返金',), 'Refund'),
+            (('振込', '送金'), 'Transfer'),
+            (('サービス料',), 'Service Fee'),
+            (('調整',), 'Adjustment'),
+        ),
+    }
+    
+    # 每种语言合成一个从行首匹配的正则：分支 i 为「.*?(关键词)」，
+    # 分支按规则顺序尝试，因此命中的一定是顺序最靠前的规则（而非字符串中最靠左的关键词）
+    _TYPE_TRANSLATE_RE = {
+        lang: re.compile('|'.join(
+            f'.*?(?P<r{i}>' + '|'.join(map(re.escape, keywords)) + ')'
+            for i, (keywords, _) in enumerate(rules)
+        ), re.S)
+        for lang, rules in TYPE_KEYWORDS.items()
+    }
+    _TYPE_TRANSLATE_RESULTS = {
+        lang: tuple(type_en for _, type_en in rules)
+        for lang, rules in TYPE_KEYWORDS.items()
+    }
+    
     # 多语言完整字段映射
     # 格式: {标准字段名: {lang: 本地化字段名}}
     FIELD_MAPPING_MULTI = {
@@ -188,6 +249,13 @@ class AmazonCSVParser(BaseParser):
         'total',
     ]
     
+    _NUMERIC_FIELD_SET = frozenset(NUMERIC_FIELDS)
+    
+    # 候选文件编码（按优先级尝试）
+    ENCODINGS = ('utf-8-sig', 'utf-8', 'gbk', 'shift_jis', 'latin-1', 'cp1252')
+    # 编码嗅探时读取的文件头字节数
+    ENCODING_SNIFF_BYTES = 64 * 1024
+    
     def __init__(self):
         super().__init__()
         self.encoding = 'utf-8-sig'
@@ -203,15 +271,17 @@ class AmazonCSVParser(BaseParser):
             source_file=path.name,
         )
         
+        f = None
         try:
-            # 读取文件
-            content = self._read_file(path)
-            if not content:
+            # 打开文件后流式读取：不把整个文件读成字符串再切分、拼接
+            f = self._open_file(path)
+            head = ''.join(f.readline() for _ in range(50)) if f else ''
+            if not head:
                 result.errors.append("文件为空或无法读取")
                 return result
 
-            # 检测表头行和语言
-            header_idx, lang = self._detect_header_and_lang(content)
+            # 检测表头行和语言（只需前50行）
+            header_idx, lang = self._detect_header_and_lang(head)
             
             if header_idx is None:
                 result.errors.append("未找到有效表头行 (支持 En/De/Fr/Jp)")
@@ -220,7 +290,8 @@ class AmazonCSVParser(BaseParser):
             # 解析店铺信息：文件名优先；仅当文件名未包含站点时，才用正文中的币种说明
             store_info = StoreInfo.from_filename(path.name)
             if not store_info.marketplace:
-                inferred_from_content = self._infer_currency_and_site_from_content(content)
+                f.seek(0)
+                inferred_from_content = self._infer_currency_and_site_from_content(f.read(8000))
                 if inferred_from_content:
                     store_info.currency = inferred_from_content['currency']
                     store_info.marketplace = inferred_from_content.get('marketplace', '') or store_info.marketplace
@@ -249,12 +320,15 @@ class AmazonCSVParser(BaseParser):
             result.marketplace = store_info.marketplace
             result.currency = store_info.currency
 
-            lines = content.split('\n')
-            csv_content = '\n'.join(lines[header_idx:])
+            # 定位到表头行，CSV 从这里开始读取
+            f.seek(0)
+            for _ in range(header_idx):
+                f.readline()
+            csv_start = f.tell()
 
             # 若文件名中无站点（如 2025AprMonthlyUnifiedTransaction），尝试从 CSV 表头/首行推断币种与站点
             if not store_info.marketplace or store_info.currency == 'USD':
-                inferred = self._infer_currency_and_marketplace_from_csv(csv_content)
+                inferred = self._infer_currency_and_marketplace_from_csv(f)
                 if inferred.get('currency'):
                     result.currency = store_info.currency = inferred['currency']
                 if inferred.get('marketplace'):
@@ -267,8 +341,9 @@ class AmazonCSVParser(BaseParser):
                         currency=store_info.currency,
                     )
             
+            f.seek(csv_start)
             transactions, stats, errors = self._parse_csv(
-                csv_content, store_info, path.name, lang
+                f, store_info, path.name, lang
             )
             
             result.transactions = transactions
@@ -279,18 +354,24 @@ class AmazonCSVParser(BaseParser):
             
         except Exception as e:
             result.errors.append(f"解析异常: {str(e)}")
+        finally:
+            if f is not None:
+                f.close()
         
         return result
     
     def _detect_header_and_lang(self, content: str) -> Tuple[Optional[int], str]:
         """检测表头行位置及语言"""
-        lines = content.split('\n')
+        # 只切分前50行，不切分整个文件
+        lines = content.split('\n', 50)[:50]
         
-        for i, line in enumerate(lines[:50]): # 只扫描前50行
+        for i, line in enumerate(lines):
             line_lower = line.lower()
+            if not self._ANY_LANG_MARKER_RE.search(line_lower):
+                continue
             
-            # 检测试语言标记
-            for lang, markers in self.LANG_MARKERS.items():
+            # 检测试语言标记（较长、较少见的标记在前，普通说明行通常第一个标记就不命中）
+            for lang, markers in self._LANG_MARKERS_ORDERED:
                 if all(marker in line_lower for marker in markers):
                     return i, lang
                     
@@ -301,73 +382,103 @@ class AmazonCSVParser(BaseParser):
         idx, _ = self._detect_header_and_lang(content)
         return idx
     
-    def _read_file(self, path: Path) -> str:
-        """读取文件内容 (尝试多种编码)"""
-        encodings = ['utf-8-sig', 'utf-8', 'gbk', 'shift_jis', 'latin-1', 'cp1252']
+    def _open_file(self, path: Path) -> Optional[TextIO]:
+        """以能完整解码文件的编码打开文件 (尝试多种编码)，调用方负责关闭"""
+        # 先用文件头排除明显不符的编码，避免对每个候选编码都读取、解码整个文件
+        with path.open('rb') as fb:
+            sample = fb.read(self.ENCODING_SNIFF_BYTES)
         
-        for enc in encodings:
+        for enc in self.ENCODINGS:
             try:
-                return path.read_text(encoding=enc)
+                # 增量解码且 final=False：样本末尾被截断的多字节字符不算解码失败
+                codecs.getincrementaldecoder(enc)().decode(sample, final=False)
+                f = path.open(encoding=enc)
             except (UnicodeDecodeError, LookupError):
                 continue
-        return ""
-
+            try:
+                # 分块校验整个文件可解码（不在内存中保留全文），通过后回到开头直接使用
+                while f.read(1 << 20):
+                    pass
+                f.seek(0)
+                return f
+            except UnicodeDecodeError:
+                f.close()
+        return None
+    
     # 正文中“写明币种”时，币种对应的默认站点（与 StoreInfo.CURRENCY_MAP 一致）
     _CONTENT_CURRENCY_TO_SITE = {
         'GBP': 'UK', 'USD': 'US', 'EUR': 'DE', 'CAD': 'CA', 'JPY': 'JP', 'AUD': 'AU',
     }
 
+    # 正文中的币种说明
+    # 英文: "All amounts in GBP, unless specified" / "all amounts in EUR"
+    # 德文等也可能有类似表述，用同一正则匹配 XXX 为已知币种代码即可
+    _CURRENCY_NOTE_RE = re.compile(
+        r'all\s+amounts\s+in\s+(GBP|EUR|USD|CAD|JPY|AUD)\b',
+        re.IGNORECASE,
+    )
+    
+    # 从 CSV 表头/首行推断时：币种列名关键字、可识别的币种、settlement id 中可识别的站点代码
+    _CURRENCY_COL_KEYWORDS = ('currency', 'währung', 'devise', '通貨')
+    _CSV_CURRENCIES = frozenset(_CONTENT_CURRENCY_TO_SITE)
+    _SETTLEMENT_SITE_CODES = ('UK', 'DE', 'US', 'CA', 'FR', 'IT', 'ES', 'JP', 'AU')
+
     def _infer_currency_and_site_from_content(self, content: str) -> dict:
         """从文件正文中识别“写明币种”的说明，返回该币种及对应站点（通用，不针对某一种币种）。"""
         if not content:
             return {}
-        text_lower = content[:8000].lower()  # 只扫前一段，避免大文件过慢
-        # 英文: "All amounts in GBP, unless specified" / "all amounts in EUR"
-        # 德文等也可能有类似表述，用同一正则匹配 XXX 为已知币种代码即可
-        match = re.search(
-            r'all\s+amounts\s+in\s+(GBP|EUR|USD|CAD|JPY|AUD)\b',
-            text_lower,
-            re.IGNORECASE,
-        )
+        # 只扫前一段，避免大文件过慢；正则本身忽略大小写，无需先切片、转小写复制一份
+        match = self._CURRENCY_NOTE_RE.search(content, 0, 8000)
         if not match:
             return {}
         currency = match.group(1).upper()
         site = self._CONTENT_CURRENCY_TO_SITE.get(currency, '')
         return {'currency': currency, 'marketplace': site}
 
-    def _infer_currency_and_marketplace_from_csv(self, csv_content: str) -> dict:
-        """当文件名中无站点时，从 CSV 表头与首行推断币种（及若可能则站点）。"""
+    def _infer_currency_and_marketplace_from_csv(self, csv_file: TextIO) -> dict:
+        """当文件名中无站点时，从 CSV 表头与首行推断币种（及若可能则站点）。csv_file 需定位在表头行。"""
         out = {}
         try:
-            reader = csv.DictReader(io.StringIO(csv_content))
-            if not reader.fieldnames:
+            reader = csv.reader(csv_file)
+            fieldnames = next(reader, None)
+            if not fieldnames:
                 return out
-            fieldnames_lower = {f.strip().lower(): f for f in reader.fieldnames}
+            fieldnames_lower = {f.strip().lower(): f for f in fieldnames}
             # 找“币种”列：英文 currency，德文 währung，法文 devise 等
             currency_col = None
             for key in fieldnames_lower:
-                if 'currency' in key or 'währung' in key or 'devise' in key or '通貨' in key or 'currency code' in key:
+                if any(kw in key for kw in self._CURRENCY_COL_KEYWORDS):
                     currency_col = fieldnames_lower[key]
                     break
-            if currency_col:
-                row = next(reader, None)
-                if row and row.get(currency_col, '').strip():
-                    raw = row.get(currency_col, '').strip().upper()
-                    if raw in ('USD', 'GBP', 'EUR', 'CAD', 'JPY', 'AUD'):
-                        out['currency'] = raw
-            # 若存在 settlement id 列，尝试从首行值推断站点（如 123-UK-456 或 UK-123）
+            # settlement id 列，用于从首行值推断站点（如 123-UK-456 或 UK-123）
             settlement_col = None
             for key in fieldnames_lower:
                 if 'settlement' in key and 'id' in key:
                     settlement_col = fieldnames_lower[key]
                     break
+            if not currency_col and not settlement_col:
+                return out
+            
+            # 只读一次首个非空数据行，币种与站点都从这一行取值；
+            # 按列名组成字典（与 DictReader 一致：同名列取最后一列，行内缺失的列为 None）
+            row = None
+            values = next((r for r in reader if r), None)
+            if values is not None:
+                row = dict(zip(fieldnames, values))
+                for key in fieldnames[len(values):]:
+                    row[key] = None
+            
+            if currency_col:
+                if row and row.get(currency_col, '').strip():
+                    raw = row.get(currency_col, '').strip().upper()
+                    if raw in self._CSV_CURRENCIES:
+                        out['currency'] = raw
             if settlement_col and not out.get('marketplace'):
-                reader2 = csv.DictReader(io.StringIO(csv_content))
-                row = next(reader2, None)
                 if row:
                     val = (row.get(settlement_col) or '').upper()
-                    for code in ('UK', 'DE', 'US', 'CA', 'FR', 'IT', 'ES', 'JP', 'AU'):
-                        if code in val or val.startswith(code + '-') or val.startswith(code + '_'):
+                    # 前缀形式（UK-123、UK_123）也包含站点代码，只需判断是否出现
+                    for code in self._SETTLEMENT_SITE_CODES:
+                        if code in val:
                             out['marketplace'] = code
                             break
         except Exception:
@@ -376,7 +487,7 @@ class AmazonCSVParser(BaseParser):
     
     def _parse_csv(
         self, 
-        csv_content: str, 
+        csv_file: TextIO, 
         store_info: StoreInfo,
         source_file: str,
         lang: str
@@ -386,145 +497,257 @@ class AmazonCSVParser(BaseParser):
         errors = []
         stats = ParseStats()
         
-        reader = csv.DictReader(io.StringIO(csv_content))
+        # csv 模块（C 实现）一次切分全部行，再整体装入 DataFrame。
+        # 不直接用 pd.read_csv 切分：它会跳过仅含空白的行、遇到字段数多于表头的行直接报错，
+        # 行数统计与行号会与原先逐行读取不一致
+        reader = csv.reader(csv_file)
+        fieldnames = next(reader, None)
         
-        # 构建当前语言的字段映射表: csv_col -> attr_name
-        current_mapping = {}
-        if reader.fieldnames:
-            fieldnames_lower = {f.strip().lower(): f for f in reader.fieldnames}
-            
-            for attr, lang_map in self.FIELD_MAPPING_MULTI.items():
-                target_col = lang_map.get(lang)
-                if not target_col:
-                    target_col = lang_map.get('en') # 回退到英文
-                
-                if target_col and target_col in fieldnames_lower:
-                    current_mapping[fieldnames_lower[target_col]] = attr
-        else:
+        if not fieldnames:
             errors.append("无法读取CSV列名")
             return transactions, stats, errors
-            
-        row_num = 0
-        for row in reader:
-            row_num += 1
+        
+        # 按列名取值：同名列以最后一列为准；完全空行跳过，字段不足的行补空串
+        col_pos, mapped = self._column_plan(tuple(fieldnames), lang)
+        df = pd.DataFrame([row for row in reader if row], dtype=object)
+        df = df.reindex(columns=list(col_pos.values()), fill_value='').fillna('')
+        df.columns = list(col_pos)
+        
+        # 只取映射到 Transaction 字段的列，并重命名为字段名
+        data = df[[f for f, _ in mapped]].copy()
+        attrs = [attr for _, attr in mapped]
+        
+        # 按列预处理：数值列整列解析为 Decimal，日期列整列解析为 datetime，文本列整列 strip；
+        # 逐行只需取用结果，不再按字段名分支
+        type_raw_col = None
+        for j, attr in enumerate(attrs):
+            column = data.iloc[:, j]
+            if attr in self._NUMERIC_FIELD_SET:
+                data.isetitem(j, self._parse_decimal_column(column, lang))
+            elif attr == 'date_time':
+                # 显式 object 类型，保持 datetime/None 原样，不被转换为 datetime64
+                data.isetitem(j, pd.Series(self._parse_datetime_column(column), index=data.index, dtype=object))
+            else:
+                data.isetitem(j, column.str.strip())
+                if attr == 'type_raw':
+                    type_raw_col = j
+        
+        # 交易类型由原始 type 列（同名多列时取最后一列）整列翻译，作为 type 字段追加在最后
+        if type_raw_col is not None:
+            data.insert(
+                data.shape[1], 'type',
+                self._parse_type_column(data.iloc[:, type_raw_col], lang),
+                allow_duplicates=True,
+            )
+            attrs.append('type')
+        
+        # 整行所有列都为空白的行视为空行
+        has_content = self._content_mask(df).tolist()
+        # total 校验整列完成，逐行只需取结果（None 表示需逐行校验）
+        verified = self._verify_totals(data, attrs)
+        
+        rows = zip(has_content, data.itertuples(index=False, name=None))
+        for row_num, (row_has_content, values) in enumerate(rows, 1):
             stats.total_rows += 1
+            if not row_has_content:
+                stats.skipped_rows += 1
+                continue
             
             try:
                 txn = self._parse_row(
-                    row, current_mapping,
-                    store_info, source_file, row_num, lang
+                    zip(attrs, values),
+                    store_info, source_file, row_num
                 )
                 
-                if txn:
-                    transactions.append(txn)
-                    stats.parsed_rows += 1
-                    
-                    type_name = txn.type.value
-                    stats.type_counts[type_name] = stats.type_counts.get(type_name, 0) + 1
-                    
-                    if txn.is_total_verified():
-                        stats.total_verified += 1
-                    else:
-                        stats.total_mismatch += 1
+                transactions.append(txn)
+                stats.parsed_rows += 1
+                
+                ok = verified[row_num - 1]
+                if ok is None:
+                    ok = txn.is_total_verified()
+                if ok:
+                    stats.total_verified += 1
                 else:
-                    stats.skipped_rows += 1
+                    stats.total_mismatch += 1
                     
             except Exception as e:
                 stats.error_rows += 1
                 errors.append(f"行{row_num}: {str(e)}")
         
+        # 按类型计数在循环结束后一次完成（已加入结果的交易都计入，包括校验时出错的行）
+        stats.type_counts = dict(Counter(txn.type.value for txn in transactions))
+        
         return transactions, stats, errors
     
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _column_to_attr(lang: str) -> dict:
+        """当前语言的 小写列名 -> 字段名（语言缺省的字段回退到英文列名；同一列名取后定义的字段）"""
+        column_to_attr = {}
+        for attr, lang_map in AmazonCSVParser.FIELD_MAPPING_MULTI.items():
+            target_col = lang_map.get(lang)
+            if not target_col:
+                target_col = lang_map.get('en') # 回退到英文
+            if target_col:
+                column_to_attr[target_col] = attr
+        return column_to_attr
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _column_plan(cls, fieldnames: Tuple[str, ...], lang: str) -> Tuple[dict, tuple]:
+        """
+        按表头计算列位置与字段映射，同一表头、语言只计算一次
+
+        Returns:
+            (col_pos, mapped)：col_pos 为 列名 -> 位置（同名列取最后一列，按首次出现顺序）；
+            mapped 为按列顺序排列的 (列名, 字段名)。结果被缓存共享，调用方不得修改
+        """
+        column_to_attr = cls._column_to_attr(lang)
+        
+        # 构建当前语言的字段映射表: csv_col -> attr_name
+        fieldnames_lower = {f.strip().lower(): f for f in fieldnames}
+        current_mapping = {
+            fieldnames_lower[col]: attr
+            for col, attr in column_to_attr.items() if col in fieldnames_lower
+        }
+        
+        col_pos = {f: i for i, f in enumerate(fieldnames)}
+        mapped = tuple(
+            (f, attr) for f in col_pos if (attr := current_mapping.get(f.strip()))
+        )
+        return col_pos, mapped
+    
+    def _verify_totals(self, data: pd.DataFrame, attrs: List[str]) -> list:
+        """
+        整列校验 total 与各金额字段之和，结果与逐行 Transaction.is_total_verified 一致
+
+        解析后的金额都是两位小数（或 0）的 Decimal，换算为整数分后用 int64 整列求和，
+        相差不超过 1 分即为通过；此范围内 Decimal 运算没有舍入，结果完全相同。
+        取值非有限（NaN）或超出范围的行返回 None，由调用方逐行校验，保留原有的异常与舍入行为
+        """
+        n = len(data)
+        # 同一字段出现多次时以最后一列为准（与构造 Transaction 时一致）
+        columns = {attr: j for j, attr in enumerate(attrs) if attr in self._NUMERIC_FIELD_SET}
+        sums = np.zeros(n, dtype=np.int64)
+        totals = np.zeros(n, dtype=np.int64)
+        fallback = np.zeros(n, dtype=bool)
+        for attr, j in columns.items():
+            values = data.iloc[:, j].tolist()
+            cents = {v: self._to_cents(v) for v in set(values)}
+            col = [cents[v] for v in values]
+            fallback |= np.fromiter((c is None for c in col), dtype=bool, count=n)
+            col = np.fromiter((c or 0 for c in col), dtype=np.int64, count=n)
+            if attr == 'total':
+                totals = col
+            else:
+                sums += col
+        
+        ok = (np.abs(totals - sums) <= 1).tolist()
+        if not fallback.any():
+            return ok
+        return [None if fb else v for fb, v in zip(fallback.tolist(), ok)]
+    
+    # 整列校验时单个金额的上限（分）：16 个字段相加不会超出 int64，Decimal 求和也不会舍入
+    _MAX_EXACT_CENTS = 10 ** 15
+    
+    @classmethod
+    def _to_cents(cls, value: Decimal) -> Optional[int]:
+        """两位小数以内的有限金额换算为整数分，否则返回 None"""
+        if not value.is_finite() or value.as_tuple().exponent < -2:
+            return None
+        cents = int(value.scaleb(2))
+        return cents if abs(cents) < cls._MAX_EXACT_CENTS else None
+    
+    @staticmethod
+    def _content_mask(df: pd.DataFrame) -> np.ndarray:
+        """
+        逐行判断是否有非空白内容
+
+        按列推进，只检查尚未发现内容的行：通常第一列（日期）就确定了绝大多数行；
+        用 isspace 判断空白，不为每个单元格 strip 生成新字符串
+        """
+        has_content = np.zeros(len(df), dtype=bool)
+        for j in range(df.shape[1]):
+            pending = np.flatnonzero(~has_content)
+            if not len(pending):
+                break
+            values = df.iloc[:, j].to_numpy()[pending]
+            has_content[pending] = [bool(v) and not v.isspace() for v in values]
+        return has_content
+    
     def _parse_row(
         self, 
-        row: dict, 
-        mapping: dict,
+        fields,
         store_info: StoreInfo,
         source_file: str,
-        row_num: int,
-        lang: str
-    ) -> Optional[Transaction]:
-        """解析单行数据"""
-        # 提取关键字段判断空行
-        # 这里需要用反向映射找到csv列名
-        # 为简化，遍历row
-        has_content = False
-        for v in row.values():
-            if v and v.strip():
-                has_content = True
-                break
-        if not has_content:
-            return None
-            
-        txn = Transaction(
+        row_num: int
+    ) -> Transaction:
+        """解析单行数据（fields 为 (字段名, 已按列预处理的值) 序列）"""
+        # 一次构造 Transaction：数值、日期、类型均已按列解析，文本已 strip；
+        # 同一字段出现多次时以后者为准。type_raw 由 Transaction 负责驻留
+        kwargs = dict(fields)
+        
+        return Transaction(
             store_id=store_info.store_id,
             store_name=store_info.store_name,
             platform=store_info.platform,
             currency=store_info.currency,
             source_file=source_file,
             row_number=row_num,
+            **kwargs,
         )
-        
-        # 根据映射填充字段
-        for csv_col, value in row.items():
-            if not csv_col: continue
-            
-            attr_name = mapping.get(csv_col.strip())
-            if not attr_name: continue
-            
-            val_str = value.strip() if value else ''
-            
-            if attr_name == 'date_time':
-                txn.date_time = self._parse_datetime(val_str)
-            elif attr_name == 'type_raw':
-                txn.type_raw = val_str
-                # 需要翻译type? 我们的TransactionType.from_string目前只支持英文+变体
-                # 建立多语言Type映射
-                type_en = self._translate_type(val_str, lang)
-                txn.type = TransactionType.from_string(type_en)
-            elif attr_name in self.NUMERIC_FIELDS:
-                setattr(txn, attr_name, self._parse_decimal(val_str, lang))
-            else:
-                setattr(txn, attr_name, val_str)
-                
-        return txn
     
-    def _translate_type(self, value: str, lang: str) -> str:
-        """翻译交易类型"""
-        if lang == 'en': return value
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _translate_type(value: str, lang: str) -> str:
+        """翻译交易类型（同一文件中类型取值很少，按 (value, lang) 缓存）"""
+        pattern = AmazonCSVParser._TYPE_TRANSLATE_RE.get(lang)
+        if pattern is None:
+            return value
         
-        val_lower = value.lower()
-        
-        # 德语映射
-        if lang == 'de':
-            if 'bestellung' in val_lower: return 'Order'
-            if 'erstattung' in val_lower: return 'Refund'
-            if 'übertrag' in val_lower or 'transfer' in val_lower: return 'Transfer'
-            if 'servicegebühr' in val_lower: return 'Service Fee'
-            if 'anpassung' in val_lower: return 'Adjustment'
-            
-        # 法语映射
-        if lang == 'fr':
-            if 'commande' in val_lower: return 'Order'
-            if 'remboursement' in val_lower: return 'Refund'
-            if 'transfert' in val_lower: return 'Transfer'
-            if 'frais de service' in val_lower: return 'Service Fee'
-            if 'ajustement' in val_lower: return 'Adjustment'
-            
-        # 日语映射
-        if lang == 'jp':
-            if '注文' in val_lower: return 'Order'
-            if '返金' in val_lower: return 'Refund'
-            if '振込' in val_lower or '送金' in val_lower: return 'Transfer'
-            if 'サービス料' in val_lower: return 'Service Fee'
-            if '調整' in val_lower: return 'Adjustment'
-            
-        return value
+        m = pattern.match(value.lower())
+        if m is None:
+            return value
+        return AmazonCSVParser._TYPE_TRANSLATE_RESULTS[lang][int(m.lastgroup[1:])]
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _resolve_type(value: str, lang: str) -> TransactionType:
+        """原始 type 取值 -> TransactionType（翻译与 from_string 一并按 (value, lang) 缓存，跨文件复用）"""
+        # 需要翻译type? 我们的TransactionType.from_string目前只支持英文+变体
+        # 建立多语言Type映射
+        return TransactionType.from_string(AmazonCSVParser._translate_type(value, lang))
+    
+    def _parse_type_column(self, values: pd.Series, lang: str) -> list:
+        """整列翻译交易类型（值已 strip；同一文件中类型取值很少，按去重取值解析）"""
+        values = values.tolist()
+        parsed = {v: self._resolve_type(v, lang) for v in set(values)}
+        return [parsed[v] for v in values]
+    
+    def _parse_datetime_column(self, values: pd.Series) -> list:
+        """整列解析日期时间（按去重取值解析，重复的时间戳只解析一次）"""
+        values = values.tolist()
+        parsed = {v: self._parse_datetime(v) for v in set(values)}
+        return [parsed[v] for v in values]
+    
+    def _parse_decimal_column(self, values: pd.Series, lang: str) -> list:
+        """
+        整列解析数值
 
+        整列 strip 后按去重取值逐个调用 _parse_decimal：同一文件中金额取值大量重复
+        （如 0、固定费率），解析次数降为不同取值的个数；Decimal 不可变，可在交易间共享
+        """
+        stripped = values.str.strip().tolist()
+        parsed = {v: self._parse_decimal(v, lang) for v in set(stripped)}
+        return [parsed[v] for v in stripped]
+    
+    # 欧洲格式数值转标准格式：一次 translate 同时去掉千分位点、把小数逗号换成点
+    _EU_NUMBER_TRANS = str.maketrans({'.': None, ',': '.'})
+    
     def _parse_decimal(self, value: str, lang: str) -> Decimal:
         """解析数值 (处理多语言格式)"""
         if not value or not str(value).strip():
-            return Decimal('0')
+            return _ZERO
         
         clean = str(value).strip()
         
@@ -533,7 +756,7 @@ class AmazonCSVParser(BaseParser):
             # 有些文件可能已经是标准格式，尝试判断
             # 如果同时有点和逗号，且逗号在后 -> 欧洲格式
             if '.' in clean and ',' in clean and clean.rfind(',') > clean.rfind('.'):
-                clean = clean.replace('.', '').replace(',', '.')
+                clean = clean.translate(AmazonCSVParser._EU_NUMBER_TRANS)
             elif ',' in clean and '.' not in clean:
                 # 只有逗号 -> 可能是小数点
                 # 除非它是只有千分位? 假设是小数点
@@ -543,26 +766,42 @@ class AmazonCSVParser(BaseParser):
             clean = clean.replace(',', '')
             
         try:
-            return Decimal(clean).quantize(Decimal('0.01'))
+            amount = Decimal(clean)
+            # 已是两位小数（Amazon 导出的常见形式）时 quantize 结果与原值完全相同，直接返回；
+            # 位数超过精度时 quantize 会报错（按 0 处理），这类超长值仍走 quantize
+            if clean[-3:-2] == '.' and len(clean) <= 28:
+                return amount
+            return amount.quantize(_CENT)
         except (InvalidOperation, ValueError):
-            return Decimal('0')
+            return _ZERO
 
     
-    def _parse_datetime(self, value: str) -> Optional[datetime]:
-        """解析日期时间"""
+    # 日期时间格式，按顺序尝试（存在日/月顺序不同的格式，顺序决定结果，不能调整）
+    DATETIME_FORMATS = (
+        '%Y-%m-%d %H:%M:%S',
+        '%Y-%m-%dT%H:%M:%S',
+        '%d/%m/%Y %H:%M:%S',
+        '%m/%d/%Y %H:%M:%S',
+        '%Y/%m/%d %H:%M:%S',
+    )
+    
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _parse_datetime(value: str) -> Optional[datetime]:
+        """解析日期时间（按取值缓存，重复的时间戳只解析一次）"""
         if not value:
             return None
         
-        formats = [
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%dT%H:%M:%S',
-            '%d/%m/%Y %H:%M:%S',
-            '%m/%d/%Y %H:%M:%S',
-            '%Y/%m/%d %H:%M:%S',
-        ]
-        
         value = value.strip()
-        for fmt in formats:
+        # 所有格式都以数字开头（%Y/%d/%m），首字符不是数字的
+        # （如英文站点的 "Jan 1, 2025 ..."）不可能匹配，免去逐个格式失败的开销
+        if not value[:1].isdecimal():
+            return None
+        # 所有格式都以 %S 结尾，末字符不是数字（如带 UTC/PDT 等时区后缀）同样不可能匹配
+        if not value[-1].isdecimal():
+            return None
+        
+        for fmt in AmazonCSVParser.DATETIME_FORMATS:
             try:
                 return datetime.strptime(value, fmt)
             except ValueError:
@@ -594,7 +833,7 @@ class AmazonCSVParser(BaseParser):
         # 从交易记录提取
         for txn in transactions:
             if txn.date_time:
-                return txn.date_time.strftime('%Y-%m')
+                return f"{txn.date_time.year}-{txn.date_time.month:02d}"
         
         return ""
 
@@ -603,3 +842,14 @@ def parse_amazon_csv(file_path: str) -> ParseResult:
     """便捷函数: 解析Amazon CSV"""
     parser = AmazonCSVParser()
     return parser.parse(file_path)
+
+
+def parse_many(file_paths: Iterable[str], max_workers: Optional[int] = None) -> List[ParseResult]:
+    """
+    便捷函数: 批量解析多个Amazon CSV，结果顺序与输入一致
+
+    解析是纯 Python 的 CPU 密集任务，多文件时用多进程绕开 GIL；
+    只有一个可用进程或文件较少时直接顺序解析
+    """
+    paths = [str(p) for p in file_paths]
+    return map_files(parse_amazon_csv, paths, max_workers=max_workers)
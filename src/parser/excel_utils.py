@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Excel 读取工具
+
+基于 openpyxl 只读模式逐行流式读取 xlsx：
+- 不构建完整 DOM / DataFrame，内存占用与单行大小相关
+- values_only=True 跳过单元格样式对象，直接取值
+- EXCEL_ENGINE：pandas 读取时优先使用的引擎（可选 python-calamine）
+"""
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import openpyxl
+import pandas as pd
+
+# python-calamine 可选：安装后 pandas 使用 Rust 实现的 calamine 引擎读取 xlsx/xls，
+# 未安装时为 None，由 pandas 按扩展名自动选择（openpyxl / xlrd）
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+
+def open_workbook(file_path):
+    """以只读、取公式缓存值的方式打开 xlsx 工作簿（调用方负责 close）"""
+    return openpyxl.load_workbook(Path(file_path), read_only=True, data_only=True)
+
+
+def iter_sheet_rows(ws, max_rows: Optional[int] = None) -> Iterator[Tuple]:
+    """
+    逐行产出工作表的单元格值元组
+
+    部分平台导出的文件 dimension 信息不准确（例如只声明 A1:A1），
+    这里与 pandas 的处理一致，先重置再读取；因此各行长度可能不一致，
+    取值时请使用 cell_value 做越界保护。
+    """
+    ws.reset_dimensions()
+    return ws.iter_rows(values_only=True, max_row=max_rows)
+
+
+# openpyxl 可直接流式读取的格式；其余（如 .xls）回退到 pandas
+OPENPYXL_SUFFIXES = ('.xlsx', '.xlsm')
+
+
+def iter_file_rows(file_path, sheet_index: int = 0, max_rows: Optional[int] = None) -> Iterator[Tuple]:
+    """
+    逐行读取工作簿中第 sheet_index 个工作表，空单元格为 None
+
+    xlsx 走 openpyxl 只读流式读取，调用方找到目标后可直接停止迭代；
+    建议配合 contextlib.closing 使用，以便提前退出时及时关闭工作簿。
+    """
+    if Path(file_path).suffix.lower() not in OPENPYXL_SUFFIXES:
+        df = pd.read_excel(
+            file_path, sheet_name=sheet_index, header=None, nrows=max_rows, engine=EXCEL_ENGINE
+        )
+        yield from _frame_rows(df)
+        return
+
+    wb = open_workbook(file_path)
+    try:
+        if sheet_index < len(wb.worksheets):
+            yield from iter_sheet_rows(wb.worksheets[sheet_index], max_rows)
+    finally:
+        wb.close()
+
+
+def _frame_rows(df: pd.DataFrame) -> Iterator[Tuple]:
+    """逐行产出 DataFrame 的值元组，缺失值为 None（与 openpyxl 空单元格一致）"""
+    for row in df.itertuples(index=False, name=None):
+        yield tuple(None if pd.isna(v) else v for v in row)
+
+
+class SheetReader:
+    """
+    按工作表名逐行读取工作簿（调用方负责 close，或配合 contextlib.closing 使用）
+
+    xlsx 走 openpyxl 只读流式读取；其余格式（如 .xls）回退到 pandas，
+    按需读取单个工作表后逐行产出。两种方式下空单元格均为 None。
+    """
+    
+    def __init__(self, file_path):
+        self._wb = None
+        self._xl = None
+        if Path(file_path).suffix.lower() in OPENPYXL_SUFFIXES:
+            self._wb = open_workbook(file_path)
+            self.sheet_names = self._wb.sheetnames
+        else:
+            self._xl = pd.ExcelFile(file_path, engine=EXCEL_ENGINE)
+            self.sheet_names = self._xl.sheet_names
+    
+    def iter_rows(self, sheet_name: str) -> Iterator[Tuple]:
+        """逐行读取指定工作表（行长度可能不一致，取值请使用 cell_value）"""
+        if self._wb is not None:
+            return iter_sheet_rows(self._wb[sheet_name])
+        return _frame_rows(pd.read_excel(self._xl, sheet_name=sheet_name, header=None))
+    
+    def close(self):
+        if self._wb is not None:
+            self._wb.close()
+        if self._xl is not None:
+            self._xl.close()
+
+
+def normalize_number(v):
+    """与 pandas 读取 Excel 一致：整数值的浮点单元格按整数返回"""
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def cell_value(row: Tuple, idx: int):
+    """安全读取行中第 idx 个单元格的值，越界返回 None"""
+    return row[idx] if idx < len(row) else None
@@ -5,15 +5,16 @@
 解析 收支明细_xxx.xlsx 文件
 """
 import pandas as pd
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 import re
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.models import Transaction, TransactionType
+from src.parser.excel_utils import EXCEL_ENGINE
 
 
 class ManagedStoreParser:
@@ -28,6 +29,9 @@ class ManagedStoreParser:
         '提现': TransactionType.TRANSFER,  # 排除
     }
     
+    # 结算时间格式，如 2025/07/30 08:40:25
+    TIME_FORMAT = '%Y/%m/%d %H:%M:%S'
+    
     def __init__(self):
         self.platform = 'managed_store'
     
@@ -42,70 +46,53 @@ class ManagedStoreParser:
         # 从文件名解析店铺名
         store_name = self._extract_store_name(file_path.name)
         
-        transactions = []
-        all_months = set()
-        
         try:
-            df = pd.read_excel(file_path)
+            df = pd.read_excel(file_path, engine=EXCEL_ENGINE)
         except Exception as e:
             return [], {'error': str(e)}
         
         if df.empty:
             return [], {'error': '空文件'}
         
-        # 只保留有效列 (排除重复的Unnamed列)
-        valid_cols = [c for c in df.columns if not str(c).startswith('Unnamed')]
+        # 整表一次取为二维数组，再按列取值，不再逐行构造 Series；
+        # 取到的值与 iterrows 逐行所得一致（同样按整表的公共类型转换）
+        values = df.to_numpy()
+        fee_items = [str(v).strip() for v in self._column(df, values, '费用项', '')]
+        amount_vals = self._column(df, values, '金额(CNY)', 0)
         
-        for idx, row in df.iterrows():
-            try:
-                # 解析费用项
-                fee_item = str(row.get('费用项', '')).strip()
-                if not fee_item:
-                    continue
-                
+        # 费用项为空、金额为空或无法解析的行跳过
+        amounts = [
+            self._parse_amount(v) if fee_item and not pd.isna(v) else None
+            for fee_item, v in zip(fee_items, amount_vals)
+        ]
+        kept = [i for i, amount in enumerate(amounts) if amount is not None]
+        
+        time_vals = self._column(df, values, '结算时间', None)
+        date_times = self._parse_times([time_vals[i] for i in kept])
+        all_months = {f"{dt.year}-{dt.month:02d}" for dt in date_times if dt}
+        
+        order_vals = self._column(df, values, '订单号', None)
+        row_numbers = (df.index + 2).tolist()
+        store_id = store_name.lower().replace(' ', '_')
+        source_file = str(file_path)
+        
+        transactions = [
+            Transaction(
+                date_time=date_time,
                 # 确定交易类型
-                txn_type = self.FEE_TYPE_MAP.get(fee_item, TransactionType.OTHER)
-                
-                # 解析金额
-                amount_val = row.get('金额(CNY)', 0)
-                if pd.isna(amount_val):
-                    continue
-                
-                amount = Decimal(str(amount_val))
-                
-                # 解析时间
-                date_time = None
-                time_val = row.get('结算时间')
-                if time_val and not pd.isna(time_val):
-                    try:
-                        if isinstance(time_val, str):
-                            # 格式: 2025/07/30 08:40:25
-                            date_time = datetime.strptime(time_val, '%Y/%m/%d %H:%M:%S')
-                        else:
-                            date_time = pd.to_datetime(time_val)
-                    except:
-                        pass
-                
-                if date_time:
-                    all_months.add(date_time.strftime('%Y-%m'))
-                
-                txn = Transaction(
-                    date_time=date_time,
-                    type=txn_type,
-                    type_raw=fee_item,
-                    order_id=str(row.get('订单号', '')).strip() if row.get('订单号') else '',
-                    total=amount,
-                    platform=self.platform,
-                    store_id=store_name.lower().replace(' ', '_'),
-                    store_name=store_name,
-                    currency='CNY',
-                    source_file=str(file_path),
-                    row_number=idx + 2,
-                )
-                transactions.append(txn)
-                
-            except Exception as e:
-                continue
+                type=self.FEE_TYPE_MAP.get(fee_items[i], TransactionType.OTHER),
+                type_raw=fee_items[i],
+                order_id=str(order_vals[i]).strip() if order_vals[i] else '',
+                total=amounts[i],
+                platform=self.platform,
+                store_id=store_id,
+                store_name=store_name,
+                currency='CNY',
+                source_file=source_file,
+                row_number=row_numbers[i],
+            )
+            for i, date_time in zip(kept, date_times)
+        ]
         
         meta = {
             'platform': self.platform,
@@ -119,6 +106,47 @@ class ManagedStoreParser:
         
         return transactions, meta
     
+    @staticmethod
+    def _column(df: pd.DataFrame, values, name: str, default) -> list:
+        """从整表数组中取一列的值；列不存在时整列为 default"""
+        if name in df.columns:
+            return list(values[:, df.columns.get_loc(name)])
+        return [default] * len(df)
+    
+    @staticmethod
+    def _parse_amount(amount_val) -> Optional[Decimal]:
+        """解析金额，无法解析时返回 None"""
+        try:
+            return Decimal(str(amount_val))
+        except (InvalidOperation, ValueError):
+            return None
+    
+    @classmethod
+    def _parse_times(cls, time_vals: list) -> list:
+        """整列解析结算时间：字符串按取值缓存，同一结算时间只解析一次"""
+        parsed = {}
+        date_times = []
+        for v in time_vals:
+            if isinstance(v, str):
+                if v not in parsed:
+                    parsed[v] = cls._parse_time(v)
+                date_times.append(parsed[v])
+            else:
+                date_times.append(cls._parse_time(v))
+        return date_times
+    
+    @classmethod
+    def _parse_time(cls, time_val):
+        """解析结算时间，无法解析时返回 None"""
+        if time_val and not pd.isna(time_val):
+            try:
+                if isinstance(time_val, str):
+                    return datetime.strptime(time_val, cls.TIME_FORMAT)
+                return pd.to_datetime(time_val)
+            except Exception:
+                pass
+        return None
+    
     def _extract_store_name(self, filename: str) -> str:
         """从文件名提取店铺名"""
         # 示例: 天基托管 收支明细_20250701-20250731.xlsx
@@ -5,7 +5,6 @@
 自动识别并分类各平台的账单文件
 """
 import os
-from pathlib import Path
 from typing import List, Dict, Tuple
 from dataclasses import dataclass
 import re
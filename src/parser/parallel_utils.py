@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+多文件并行处理工具
+
+各文件的解析/核算相互独立且为 CPU 密集的纯 Python 计算，
+文件较多时分发到多进程以绕开 GIL；文件很少或只有一个可用 CPU 时直接顺序处理。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+# 文件数达到该值才启用多进程，文件很少时进程启动开销得不偿失
+PARALLEL_MIN_FILES = 4
+
+
+def map_files(func: Callable, *iterables: Iterable, max_workers: Optional[int] = None) -> List:
+    """
+    对每组参数调用 func（与内置 map 相同的参数形式），返回结果列表，顺序与输入一致
+
+    多进程与顺序处理两条路径都在全部处理完成后一次性返回 list。
+    多进程时 func 需为模块级函数（可 pickle）；子进程中需要复用的解析器等对象，
+    可在模块级用 functools.lru_cache 按进程缓存。
+    """
+    jobs = list(zip(*iterables))
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, *zip(*jobs)))
+    return [func(*args) for args in jobs]
@@ -14,6 +14,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.models import Transaction, TransactionType
+from src.parser.excel_utils import EXCEL_ENGINE
 
 
 class SheinParser:
@@ -36,7 +37,7 @@ class SheinParser:
         
         try:
             # SHEIN 文件首行可能是汇总，需要跳过
-            df = pd.read_excel(file_path, header=1)
+            df = pd.read_excel(file_path, header=1, engine=EXCEL_ENGINE)
         except Exception as e:
             return [], {'error': str(e)}
         
@@ -47,25 +48,25 @@ class SheinParser:
         # 常见列名映射
         col_map = {}
         for col in df.columns:
-            col_str = str(col).lower()
-            if '订单号' in str(col) or 'order' in col_str:
+            # 列名只转换一次字符串，后续各关键字判断复用
+            name = str(col)
+            if '订单号' in name or 'order' in name.lower():
                 col_map['order_id'] = col
-            elif '应收金额' in str(col):
+            elif '应收金额' in name:
                 col_map['amount'] = col
-            elif '打款日期' in str(col) or '签收' in str(col):
+            elif '打款日期' in name or '签收' in name:
                 col_map['date'] = col
-            elif '账单类型' in str(col):
+            elif '账单类型' in name:
                 col_map['type'] = col
-            elif '站点' in str(col):
+            elif '站点' in name:
                 col_map['site'] = col
         
         # 如果找不到关键列，尝试用位置
         if 'amount' not in col_map:
             # 尝试找最后一个数值列
-            for col in reversed(df.columns.tolist()):
-                if df[col].dtype in ['float64', 'int64']:
-                    col_map['amount'] = col
-                    break
+            numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+            if len(numeric_cols):
+                col_map['amount'] = numeric_cols[-1]
         
         if 'amount' not in col_map:
             return [], {'error': '找不到金额列'}
@@ -91,7 +92,7 @@ class SheinParser:
                             pass
                 
                 if date_time:
-                    all_months.add(date_time.strftime('%Y-%m'))
+                    all_months.add(f"{date_time.year}-{date_time.month:02d}")
                 
                 # 交易类型
                 type_val = str(row.get(col_map.get('type', ''), 'ORDER')).strip()
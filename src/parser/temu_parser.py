@@ -12,6 +12,7 @@ Temu 平台解析器
 """
 import warnings
 
+import numpy as np
 import pandas as pd
 from decimal import Decimal
 from pathlib import Path
@@ -25,6 +26,7 @@ warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.models import Transaction, TransactionType
+from src.parser.excel_utils import EXCEL_ENGINE, open_workbook, iter_sheet_rows, cell_value
 
 
 class TemuParser:
@@ -44,6 +46,18 @@ class TemuParser:
         '结算': ('ORDER', 1),               # 通用结算(正数)
     }
     
+    # Temu 各类模板里金额列的常见命名（按优先级）
+    AMOUNT_COLS = (
+        '交易收入',
+        '结算金额',
+        '退款金额',
+        '运费收入',
+        '运费退款',
+        '违规金额',
+        '支出金额',
+        '扣款金额',
+    )
+    
     def __init__(self):
         self.platform = 'temu'
     
@@ -67,13 +81,23 @@ class TemuParser:
         all_months = set()
         
         try:
-            xl = pd.ExcelFile(file_path)
+            # 只打开一次工作簿，各 Sheet 复用同一个 ExcelFile（避免重复解压/解析共享字符串）
+            xl = pd.ExcelFile(file_path, engine=EXCEL_ENGINE)
+            
+            # 可识别的 Sheet 一次性批量读取；批量读取失败时由 _parse_sheet 逐个读取兜底
+            known_sheets = [sh for sh in xl.sheet_names if self._resolve_sheet_type(sh)]
+            try:
+                frames = pd.read_excel(xl, sheet_name=known_sheets) if known_sheets else {}
+            except Exception:
+                frames = {}
             
             for sheet_name in xl.sheet_names:
                 sheet_txns = self._parse_sheet(
                     file_path, 
                     sheet_name, 
-                    store_name
+                    store_name,
+                    xl,
+                    df=frames.get(sheet_name),
                 )
                 transactions.extend(sheet_txns)
                 
@@ -82,7 +106,7 @@ class TemuParser:
                     if txn.currency:
                         all_currencies.add(txn.currency)
                     if txn.date_time:
-                        all_months.add(txn.date_time.strftime('%Y-%m'))
+                        all_months.add(f"{txn.date_time.year}-{txn.date_time.month:02d}")
             
         except Exception as e:
             return [], {'error': str(e)}
@@ -126,49 +150,26 @@ class TemuParser:
         self, 
         file_path: Path, 
         sheet_name: str, 
-        store_name: str
+        store_name: str,
+        xl: pd.ExcelFile = None,
+        df: pd.DataFrame = None,
     ) -> List[Transaction]:
-        """解析单个 Sheet"""
-        
-        # 检查是否为已知的 Sheet 类型
-        # 使用最长匹配原则，避免 '结算' 误匹配 '结算-售后退款'
-        type_info = None
-        matched_prefix_len = 0
-        
-        for prefix, info in self.SHEET_TYPE_MAP.items():
-            if prefix in sheet_name:
-                if len(prefix) > matched_prefix_len:
-                    matched_prefix_len = len(prefix)
-                    type_info = info
+        """解析单个 Sheet（df 为已读取的 Sheet 数据，未提供时自行读取）"""
         
+        type_info = self._resolve_sheet_type(sheet_name)
         if not type_info:
-            # 回退规则：根据 Sheet 名字里的关键字判断正负方向
-            # 先处理一些特殊的收入 Sheet，例如「账户-税金退回」：
-            # 该 Sheet 表示平台将之前代扣的税金退回店铺，本质上属于收入，应计为正数。
-            s = str(sheet_name)
-            if '税金退回' in s:
-                type_info = ('ORDER', 1)
-            else:
-                # 一般规则：
-                # - 含「退款」或「拒付」 -> 视为退款/费用，负数
-                # - 含「支出」           -> 视为费用，负数
-                # - 含「结算」或「收入」 -> 视为收入，正数
-                if ('退款' in s) or ('拒付' in s):
-                    type_info = ('REFUND', -1)
-                elif '支出' in s:
-                    type_info = ('FEE', -1)
-                elif ('结算' in s) or ('收入' in s):
-                    type_info = ('ORDER', 1)
-                else:
-                    # 其他完全未知的 Sheet 先跳过，避免误计入
-                    return []
+            # 其他完全未知的 Sheet 先跳过，避免误计入
+            return []
         
         txn_type_str, sign = type_info
         
-        try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-        except Exception:
-            return []
+        if df is None:
+            try:
+                if xl is None:
+                    xl = pd.ExcelFile(file_path, engine=EXCEL_ENGINE)
+                df = pd.read_excel(xl, sheet_name=sheet_name)
+            except Exception:
+                return []
         
         if df.empty:
             return []
@@ -177,54 +178,40 @@ class TemuParser:
         
         # 确定金额列名
         amount_col = None
-        # Temu 各类模板里金额列的常见命名
-        possible_cols = [
-            '交易收入',
-            '结算金额',
-            '退款金额',
-            '运费收入',
-            '运费退款',
-            '违规金额',
-            '支出金额',
-            '扣款金额',
-        ]
-        for col in possible_cols:
+        for col in self.AMOUNT_COLS:
             if col in df.columns:
                 amount_col = col
                 break
         
         if not amount_col:
-            # 尝试找任意数值列
-            for col in df.columns:
-                if df[col].dtype in ['float64', 'int64']:
-                    amount_col = col
-                    break
+            # 尝试找任意数值列（取第一个）
+            numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+            if len(numeric_cols):
+                amount_col = numeric_cols[0]
         
         if not amount_col:
             return []
         
-        for idx, row in df.iterrows():
+        # 汇总行整列向量化判定，逐行循环中直接跳过
+        # 1）某一列标记为「合计」或「总计」
+        summary_mask = pd.Series(False, index=df.index)
+        for col in df.columns:
+            col_vals = df[col]
+            if col_vals.dtype == object or isinstance(col_vals.dtype, pd.StringDtype):
+                try:
+                    summary_mask |= col_vals.str.strip().isin(('合计', '总计'))
+                except AttributeError:
+                    # 整列无字符串值时 .str 不可用，不可能是汇总标记
+                    pass
+        
+        # 2）除了金额列外，其它列全部为空 / NaN，且金额列非空
+        #   （例如示例文件中最后一行只有「614.8」这一格）
+        non_amount_cols = [c for c in df.columns if c != amount_col]
+        if non_amount_cols:
+            summary_mask |= df[non_amount_cols].isna().all(axis=1) & df[amount_col].notna()
+        
+        for idx, row in df[~summary_mask].iterrows():
             try:
-                # 跳过汇总行：通常某一列会标记为「合计」或「总计」
-                is_summary_row = False
-                for v in row.values:
-                    if isinstance(v, str) and v.strip() in ('合计', '总计'):
-                        is_summary_row = True
-                        break
-                
-                # 另一种常见汇总行形式：除了金额列外，其它列全部为空 / NaN，
-                # 且金额列非空（例如示例文件中最后一行只有「614.8」这一格）
-                if not is_summary_row:
-                    non_amount_cols = [c for c in df.columns if c != amount_col]
-                    if non_amount_cols:
-                        other_vals = row[non_amount_cols]
-                        amt_val_tmp = row.get(amount_col, None)
-                        if other_vals.isna().all() and not pd.isna(amt_val_tmp):
-                            is_summary_row = True
-                
-                if is_summary_row:
-                    continue
-                
                 # 解析金额
                 amount_val = row.get(amount_col, 0)
                 if pd.isna(amount_val) or amount_val == '/':
@@ -275,6 +262,42 @@ class TemuParser:
         
         return transactions
     
+    @classmethod
+    def _resolve_sheet_type(cls, sheet_name: str):
+        """根据 Sheet 名解析 (交易类型, 正负方向)，未知 Sheet 返回 None"""
+        
+        # 检查是否为已知的 Sheet 类型
+        # 使用最长匹配原则，避免 '结算' 误匹配 '结算-售后退款'
+        type_info = None
+        matched_prefix_len = 0
+        
+        for prefix, info in cls.SHEET_TYPE_MAP.items():
+            if prefix in sheet_name:
+                if len(prefix) > matched_prefix_len:
+                    matched_prefix_len = len(prefix)
+                    type_info = info
+        
+        if not type_info:
+            # 回退规则：根据 Sheet 名字里的关键字判断正负方向
+            # 先处理一些特殊的收入 Sheet，例如「账户-税金退回」：
+            # 该 Sheet 表示平台将之前代扣的税金退回店铺，本质上属于收入，应计为正数。
+            s = str(sheet_name)
+            if '税金退回' in s:
+                type_info = ('ORDER', 1)
+            else:
+                # 一般规则：
+                # - 含「退款」或「拒付」 -> 视为退款/费用，负数
+                # - 含「支出」           -> 视为费用，负数
+                # - 含「结算」或「收入」 -> 视为收入，正数
+                if ('退款' in s) or ('拒付' in s):
+                    type_info = ('REFUND', -1)
+                elif '支出' in s:
+                    type_info = ('FEE', -1)
+                elif ('结算' in s) or ('收入' in s):
+                    type_info = ('ORDER', 1)
+        
+        return type_info
+    
     def _extract_store_name(self, filename: str) -> str:
         """从文件名提取店铺名"""
         # 示例: All F Home FundDetail-1754358591792-f173.xlsx
@@ -293,6 +316,112 @@ class TemuParser:
         return ''
 
 
+def _is_numeric_cell(v) -> bool:
+    """单元格是否可被视为数值（空值视为缺失，不影响整列判断）"""
+    if v is None or v == '':
+        return True
+    if isinstance(v, bool):
+        return False
+    if isinstance(v, (int, float)):
+        return True
+    if isinstance(v, str):
+        try:
+            float(v)
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def _first_numeric_col(n_cols: int, rows: List[Tuple]):
+    """返回第一列全部为数值（或空）的列号，没有则返回 None"""
+    for i in range(n_cols):
+        if all(_is_numeric_cell(cell_value(row, i)) for row in rows):
+            return i
+    return None
+
+
+def stream_temu(file_path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    流式读取 Temu FundDetail，仅返回 (金额数组, Sheet 类型数组)
+
+    供校验/统计脚本使用：openpyxl 只读模式逐行读取，不构建 DataFrame，
+    也不创建 Decimal / Transaction 对象。Sheet 识别、金额列选择、
+    汇总行跳过与正负方向规则与 TemuParser.parse 保持一致；
+    金额为 float64，仅用于核对，正式核算请使用 TemuParser。
+    """
+    totals = []
+    types = []
+    
+    wb = open_workbook(file_path)
+    try:
+        for ws in wb.worksheets:
+            sheet_name = ws.title
+            type_info = TemuParser._resolve_sheet_type(sheet_name)
+            if not type_info:
+                continue
+            sign = type_info[1]
+            
+            rows = iter_sheet_rows(ws)
+            header = next(rows, None)
+            if not header:
+                continue
+            
+            # 表头 -> 列号（重复表头保留第一次出现的位置）
+            idx = {}
+            for i, h in enumerate(header):
+                if h is not None and h not in idx:
+                    idx[h] = i
+            
+            amount_idx = next(
+                (idx[c] for c in TemuParser.AMOUNT_COLS if c in idx), None
+            )
+            biz_idx = [idx[c] for c in ('账务类型', '交易类型') if c in idx]
+            
+            if amount_idx is None:
+                # 无已知金额列：与 DataFrame 的数值列推断一致，
+                # 取第一列「全部可转为数值」的列（此类 Sheet 需整表缓存后判断）
+                rows = list(rows)
+                amount_idx = _first_numeric_col(len(header), rows)
+                if amount_idx is None:
+                    continue
+            
+            for row in rows:
+                amount_val = cell_value(row, amount_idx)
+                if amount_val is None or amount_val == '/':
+                    continue
+                
+                # 跳过汇总行：「合计」/「总计」标记，或除金额列外全部为空
+                if any(isinstance(v, str) and v.strip() in ('合计', '总计') for v in row):
+                    continue
+                if all(v is None or (isinstance(v, str) and not v)
+                       for i, v in enumerate(row) if i != amount_idx):
+                    continue
+                
+                try:
+                    amount = float(amount_val)
+                except (TypeError, ValueError):
+                    continue
+                
+                biz_type = ''
+                for i in biz_idx:
+                    v = cell_value(row, i)
+                    if v:
+                        biz_type = str(v).strip()
+                        break
+                if '退回-税金退回' in biz_type:
+                    amount = abs(amount)
+                else:
+                    amount *= sign
+                
+                totals.append(amount)
+                types.append(sheet_name)
+    finally:
+        wb.close()
+    
+    return np.asarray(totals, dtype=np.float64), np.asarray(types, dtype=object)
+
+
 # 测试
 if __name__ == '__main__':
     parser = TemuParser()
@@ -308,11 +437,18 @@ if __name__ == '__main__':
         total = sum(t.total for t in txns)
         print(f"平台净结算: {total} {meta.get('currency')}")
         
-        # 按类型统计
-        by_type = {}
-        for t in txns:
-            by_type[t.type_raw] = by_type.get(t.type_raw, Decimal('0')) + t.total
+        # 按类型统计：基于流式读取的数组，排序后 np.unique + np.add.reduceat 分组求和
+        totals, types = stream_temu(test_file)
+        print(f"流式核对: {len(totals)} 条, 合计 {totals.sum():.2f}")
         
-        print("\n按类型汇总:")
-        for k, v in by_type.items():
-            print(f"  {k}: {v}")
+        if len(totals):
+            types = types.astype(str)
+            order = np.argsort(types, kind='stable')
+            uniq, starts, counts = np.unique(
+                types[order], return_index=True, return_counts=True
+            )
+            sums = np.add.reduceat(totals[order], starts)
+            
+            print("\n按类型汇总:")
+            for k, c, v in zip(uniq, counts, sums):
+                print(f"  {k}: {c} 条, {v:.2f}")
@@ -7,14 +7,21 @@ Phase 2 仓库账单解析器
 import pandas as pd
 from decimal import Decimal
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator
 from datetime import datetime
 from dataclasses import dataclass, field
 import re
 import os
+import sys
+from contextlib import closing
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.parser.excel_utils import (
+    EXCEL_ENGINE, SheetReader, iter_file_rows, cell_value, normalize_number,
+)
+
 # 添加PDF处理库
 try:
     import PyPDF2
@@ -25,6 +32,11 @@ except ImportError:
     print("警告: PDF处理库未安装，请运行 'pip install PyPDF2 pdfplumber'")
 
 
+# 海洋运费 PDF 文本中的金额匹配（模块级预编译，逐行匹配时复用）
+_TRAILING_AMOUNT_RE = re.compile(r'(\d+\.\d{2})$')
+_INVOICE_TOTAL_RE = re.compile(r'invoice total:\s*([0-9,]+\.?[0-9]*)')
+
+
 @dataclass
 class WarehouseMonthlyCost:
     """仓库月度成本汇总"""
@@ -254,7 +266,8 @@ class TSPParser(BaseWarehouseParser):
         breakdown = {}
         count = 0
         
-        xl = pd.ExcelFile(file_path)
+        # 逐行读取：只需对单列求和，无需构建 DataFrame（xlsx 走 openpyxl 只读模式，.xls 回退到 pandas）
+        reader = SheetReader(file_path)
         
         # 定义每个工作表应该使用的列名
         sheet_column_mapping = {
@@ -266,63 +279,70 @@ class TSPParser(BaseWarehouseParser):
             'invoiced storage items': 'cost'
         }
         
-        # 处理每个指定的工作表
-        for sheet_name_lower, target_column in sheet_column_mapping.items():
-            # 在所有sheet中查找匹配的工作表
-            actual_sheet_name = None
-            for sheet in xl.sheet_names:
-                if sheet.lower().strip() == sheet_name_lower:
-                    actual_sheet_name = sheet
-                    break
-            
-            if actual_sheet_name is None:
-                continue
-            
-            # 读取工作表数据
-            df = pd.read_excel(file_path, sheet_name=actual_sheet_name)
-            
-            # 查找目标列
-            cost_col = None
-            target_column_lower = target_column.lower()
-            
-            # 精确匹配列名
-            for col in df.columns:
-                col_lower = str(col).lower().strip()
-                if col_lower == target_column_lower:
-                    cost_col = col
-                    break
-            
-            # 如果精确匹配失败，尝试模糊匹配
-            if cost_col is None:
-                for col in df.columns:
-                    col_lower = str(col).lower().strip()
-                    if target_column_lower in col_lower or col_lower in target_column_lower:
-                        cost_col = col
+        try:
+            # 处理每个指定的工作表
+            for sheet_name_lower, target_column in sheet_column_mapping.items():
+                # 在所有sheet中查找匹配的工作表
+                actual_sheet_name = None
+                for sheet in reader.sheet_names:
+                    if sheet.lower().strip() == sheet_name_lower:
+                        actual_sheet_name = sheet
                         break
-            
-            if cost_col is None:
-                continue
-            
-            # 计算该工作表的金额总和
-            sheet_total = Decimal('0')
-            sheet_count = 0
-            
-            for idx, row in df.iterrows():
-                try:
-                    cost_val = row.get(cost_col, 0)
-                    if pd.isna(cost_val):
+                
+                if actual_sheet_name is None:
+                    continue
+                
+                rows = reader.iter_rows(actual_sheet_name)
+                
+                # 表头为第一个非空行；空表头与 pandas 一致记为 Unnamed: n
+                header = next((r for r in rows if any(v is not None for v in r)), None)
+                if header is None:
+                    continue
+                col_names = [
+                    str(h).lower().strip() if h is not None and h != '' else f'unnamed: {i}'
+                    for i, h in enumerate(header)
+                ]
+                
+                # 查找目标列
+                target_column_lower = target_column.lower()
+                
+                # 精确匹配列名，失败时尝试模糊匹配
+                cost_idx = next(
+                    (i for i, c in enumerate(col_names) if c == target_column_lower), None
+                )
+                if cost_idx is None:
+                    cost_idx = next(
+                        (i for i, c in enumerate(col_names)
+                         if target_column_lower in c or c in target_column_lower),
+                        None,
+                    )
+                
+                if cost_idx is None:
+                    continue
+                
+                # 计算该工作表的金额总和
+                sheet_total = Decimal('0')
+                sheet_count = 0
+                
+                for row in rows:
+                    cost_val = cell_value(row, cost_idx)
+                    if cost_val is None or cost_val == '':
+                        continue
+                    try:
+                        amount = Decimal(str(cost_val))
+                    except Exception:
+                        continue
+                    if not amount.is_finite():
                         continue
-                    
-                    amount = Decimal(str(cost_val))
                     sheet_total += amount
                     sheet_count += 1
-                except Exception as e:
-                    continue
-            
-            if sheet_total > 0:
-                breakdown[actual_sheet_name] = sheet_total
-                total += sheet_total
-                count += sheet_count
+                
+                if sheet_total > 0:
+                    breakdown[actual_sheet_name] = sheet_total
+                    total += sheet_total
+                    count += sheet_count
+        finally:
+            reader.close()
         
         return total, breakdown, count
     
@@ -380,38 +400,31 @@ class Warehouse1510Parser(BaseWarehouseParser):
         1510 海外仓账单：只取第一个 sheet（账单封面/Bill cover）中的
         `账单总计(Total bill amount)`，其余 sheet 均为明细。
         """
-        xl = pd.ExcelFile(file_path)
-        if not xl.sheet_names:
-            return Decimal('0'), {}, 0
-
-        cover_sheet = xl.sheet_names[0]
-        df_cover = pd.read_excel(file_path, sheet_name=cover_sheet, header=None)
-
         total = Decimal('0')
         found = False
 
         # 在封面中定位 "Total bill amount / 账单总计 / 账单小计"等单元格，取其右侧值
         keywords = ['total bill amount', '账单总计', '账单小计', '账单合计']
 
-        for r in range(df_cover.shape[0]):
-            for c in range(df_cover.shape[1]):
-                v = df_cover.iat[r, c]
-                if isinstance(v, str):
-                    text = v.strip().lower()
-                    if not any(k in text for k in keywords):
-                        continue
+        # 逐行流式读取封面，找到总计后即停止，不读取封面剩余部分
+        with closing(iter_file_rows(file_path)) as rows:
+            for row in rows:
+                for c, v in enumerate(row):
+                    if isinstance(v, str):
+                        text = v.strip().lower()
+                        if not any(k in text for k in keywords):
+                            continue
 
-                    if c + 1 < df_cover.shape[1]:
-                        amt = df_cover.iat[r, c + 1]
+                        amt = cell_value(row, c + 1)
                         try:
-                            if pd.notna(amt):
-                                total = Decimal(str(amt))
+                            if amt is not None and amt != '':
+                                total = Decimal(str(normalize_number(amt)))
                                 found = True
                         except Exception:
                             pass
+                        break
+                if found:
                     break
-            if found:
-                break
 
         breakdown = {}
         if found:
@@ -468,41 +481,36 @@ class JDParser(BaseWarehouseParser):
         - 由于不同月份的文件格式可能有差异（金额可能在右侧1列或2列），
           需要智能搜索右侧的第一个非NaN数值
         """
-        xl = pd.ExcelFile(file_path)
-        if not xl.sheet_names:
-            return Decimal('0'), {}, 0
-
-        summary_sheet = xl.sheet_names[0]
-        
-        # 使用 header=None 读取完整表格结构
-        df = pd.read_excel(file_path, sheet_name=summary_sheet, header=None)
+        # 汇总字段都在表头区域：只读取第一个 sheet 的前 20 行，
+        # 不再把整张明细表读成 DataFrame（.xls 回退到 pandas 读取）
+        with closing(iter_file_rows(file_path, max_rows=20)) as rows:
+            head_rows = list(rows)
         
-        if df.empty:
+        if not any(any(v is not None for v in row) for row in head_rows):
             return Decimal('0'), {}, 0
 
         # 查找包含 "结算币种含税金额" 的行
         total_amount = None
         
-        for row_idx in range(min(20, df.shape[0])):
-            for col_idx in range(df.shape[1]):
-                cell_value = df.iloc[row_idx, col_idx]
-                if pd.notna(cell_value):
-                    cell_str = str(cell_value).strip()
+        for row in head_rows:
+            for col_idx, value in enumerate(row):
+                if value is not None and value != '':
+                    cell_str = str(value).strip()
                     if '结算币种含税金额' in cell_str:
                         # 智能搜索右侧的第一个有效数值
                         for offset in range(1, 5):  # 搜索右侧1-4列
-                            if col_idx + offset < df.shape[1]:
-                                amount_cell = df.iloc[row_idx, col_idx + offset]
-                                if pd.notna(amount_cell):
-                                    try:
-                                        # 清理千分位逗号并转换
-                                        amt_str = str(amount_cell).replace(',', '').strip()
-                                        total_amount = Decimal(amt_str)
-                                        # 确保是合理的正数金额
-                                        if total_amount > 0:
-                                            break
-                                    except Exception:
-                                        continue
+                            amount_cell = cell_value(row, col_idx + offset)
+                            if amount_cell is not None and amount_cell != '':
+                                amount_cell = normalize_number(amount_cell)
+                                try:
+                                    # 清理千分位逗号并转换
+                                    amt_str = str(amount_cell).replace(',', '').strip()
+                                    total_amount = Decimal(amt_str)
+                                    # 确保是合理的正数金额
+                                    if total_amount > 0:
+                                        break
+                                except Exception:
+                                    continue
                         if total_amount is not None:
                             break
             if total_amount is not None:
@@ -556,7 +564,7 @@ class HaiyangParser(BaseWarehouseParser):
             # 实际的月份归属通过extract_month方法控制
             return self._parse_freight_pdf(file_path)
 
-        xl = pd.ExcelFile(file_path)
+        xl = pd.ExcelFile(file_path, engine=EXCEL_ENGINE)
         if not xl.sheet_names:
             return Decimal('0'), {}, 0
 
@@ -595,7 +603,10 @@ class HaiyangParser(BaseWarehouseParser):
 
     def _parse_summary_sheet(self, file_path: str, xl) -> Tuple[Decimal, Dict[str, Decimal], int]:
         """解析汇总表 - 用于2024年10月和11月"""
-        df_summary = pd.read_excel(file_path, sheet_name='汇总')
+        # 仅读取用到的「类型」「金额」两列
+        df_summary = pd.read_excel(
+            xl, sheet_name='汇总', usecols=lambda c: str(c) in ('类型', '金额')
+        )
         
         total = Decimal('0')
         breakdown = {}
@@ -636,18 +647,22 @@ class HaiyangParser(BaseWarehouseParser):
             # 若没有明确的 CostBill，就使用第一个 sheet 作为兜底
             sheet_name = xl.sheet_names[0]
 
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
-
-        # 寻找计费规则金额列
-        amount_col = None
         priority_keywords = ['计费规则金额', '计费金额']
-        for kw in priority_keywords:
-            for c in df.columns:
-                if kw in str(c):
-                    amount_col = c
-                    break
-            if amount_col is not None:
-                break
+        order_keywords = ['单号', '订单号', '运单号', '单据号']
+
+        # 仅读取可能成为金额列 / 单号列的候选列（列名含上述关键字），
+        # 列顺序保持不变，下面的优先级查找结果与读取整表一致
+        candidate_keywords = priority_keywords + order_keywords
+        df = pd.read_excel(
+            xl,
+            sheet_name=sheet_name,
+            usecols=lambda c: any(kw in str(c) for kw in candidate_keywords),
+        )
+
+        # 单次遍历列名，同时确定计费规则金额列与单号列
+        amount_col, order_no_col = _find_priority_columns(
+            df.columns, priority_keywords, order_keywords
+        )
 
         if amount_col is None:
             return Decimal('0'), {}, 0
@@ -656,17 +671,6 @@ class HaiyangParser(BaseWarehouseParser):
         sheet_total = Decimal('0')
         count = 0
         
-        # 查找单号列
-        order_no_col = None
-        order_keywords = ['单号', '订单号', '运单号', '单据号']
-        for kw in order_keywords:
-            for c in df.columns:
-                if kw in str(c):
-                    order_no_col = c
-                    break
-            if order_no_col is not None:
-                break
-
         # 如果找到了单号列，则只计算有单号的记录
         if order_no_col is not None:
             for _, row in df.iterrows():
@@ -704,7 +708,7 @@ class HaiyangParser(BaseWarehouseParser):
     
     def _parse_move_fee_excel(self, file_path: str, xl) -> Tuple[Decimal, Dict[str, Decimal], int]:
         """特殊处理移仓费Excel文件 - 提取Gross列各项费用之和"""
-        df = pd.read_excel(file_path, sheet_name=xl.sheet_names[0])
+        df = pd.read_excel(xl, sheet_name=xl.sheet_names[0])
         
         try:
             # Gross列是第7列（索引6），包含各项费用金额
@@ -780,16 +784,15 @@ class HaiyangParser(BaseWarehouseParser):
         # 查找Charge Description表头行
         charge_header_found = False
         for i, line in enumerate(lines):
-            if 'charge description' in line.lower() and 'charge total' in line.lower():
+            line_lower = line.lower()
+            if 'charge description' in line_lower and 'charge total' in line_lower:
                 charge_header_found = True
                 # 在表头行之后查找数据行
                 for j in range(i + 1, min(i + 10, len(lines))):  # 查找接下来的几行
                     data_line = lines[j].strip()
                     if data_line and not data_line.lower().startswith('nett value'):  # 跳过汇总行
-                        # 提取最后一列的金额（Charge Total列）
-                        import re
-                        # 匹配行末尾的数字格式
-                        amount_match = re.search(r'(\d+\.\d{2})$', data_line)
+                        # 提取最后一列的金额（Charge Total列）：匹配行末尾的数字格式
+                        amount_match = _TRAILING_AMOUNT_RE.search(data_line)
                         if amount_match:
                             try:
                                 amount_str = amount_match.group(1)
@@ -802,9 +805,9 @@ class HaiyangParser(BaseWarehouseParser):
         
         # 如果没找到标准格式，查找Invoice Total
         for line in lines:
-            if 'invoice total:' in line.lower():
-                import re
-                amount_match = re.search(r'invoice total:\s*([0-9,]+\.?[0-9]*)', line.lower())
+            line_lower = line.lower()
+            if 'invoice total:' in line_lower:
+                amount_match = _INVOICE_TOTAL_RE.search(line_lower)
                 if amount_match:
                     try:
                         amount_str = amount_match.group(1).replace(',', '')
@@ -816,8 +819,7 @@ class HaiyangParser(BaseWarehouseParser):
         
         # 兜底方案：查找任何行末尾的金额
         for line in lines:
-            import re
-            amount_match = re.search(r'(\d+\.\d{2})$', line.strip())
+            amount_match = _TRAILING_AMOUNT_RE.search(line.strip())
             if amount_match:
                 try:
                     amount_str = amount_match.group(1)
@@ -881,13 +883,6 @@ class LHZParser(BaseWarehouseParser):
         - 账单金额 / Rechnungsbetrag
         - 未税金额合计 / Netto（不作为最终账单金额）
         """
-        xl = pd.ExcelFile(file_path)
-        if not xl.sheet_names:
-            return Decimal('0'), {}, 0
-
-        cover_sheet = xl.sheet_names[0]
-        df_cover = pd.read_excel(file_path, sheet_name=cover_sheet, header=None)
-
         keywords = [
             '账单金额', 'rechnungsbetrag',
             'total bill amount', 'invoice total', 'grand total',
@@ -896,23 +891,23 @@ class LHZParser(BaseWarehouseParser):
         total = Decimal('0')
         found = False
 
-        for r in range(df_cover.shape[0]):
-            for c in range(df_cover.shape[1]):
-                v = df_cover.iat[r, c]
-                if isinstance(v, str) and any(k in v.lower() for k in keywords):
-                    # 优先取右侧第一个可解析为数字的值
-                    for cc in range(c + 1, df_cover.shape[1]):
-                        amt = df_cover.iat[r, cc]
-                        try:
-                            if pd.notna(amt):
-                                total = Decimal(str(amt))
-                                found = True
-                                break
-                        except Exception:
-                            continue
+        # 逐行流式读取封面，找到账单金额后即停止
+        with closing(iter_file_rows(file_path)) as rows:
+            for row in rows:
+                for c, v in enumerate(row):
+                    if isinstance(v, str) and any(k in v.lower() for k in keywords):
+                        # 优先取右侧第一个可解析为数字的值
+                        for amt in row[c + 1:]:
+                            try:
+                                if amt is not None and amt != '':
+                                    total = Decimal(str(normalize_number(amt)))
+                                    found = True
+                                    break
+                            except Exception:
+                                continue
+                        break
+                if found:
                     break
-            if found:
-                break
 
         breakdown = {}
         if found:
@@ -976,7 +971,7 @@ class AoyunhuiParser(BaseWarehouseParser):
  
     def _load_costbill_df( self , file_path : str): 
         """加载奥韵汇账单的 CostBill sheet.""" 
-        xl = pd.ExcelFile(file_path) 
+        xl = pd.ExcelFile(file_path, engine=EXCEL_ENGINE) 
         if  not xl.sheet_names: 
             return  None 
  
@@ -990,7 +985,14 @@ class AoyunhuiParser(BaseWarehouseParser):
             sheet_name = xl.sheet_names[0] 
  
  
-        return  pd.read_excel(file_path, sheet_name =sheet_name) 
+ 
+        # 仅读取金额类列（列名含「金额」）与计费时间候选列 
+        time_keywords = ['计费时间', '计费日期', 'Billing Time', 'Billing Date', '时间', 'ʱ'] 
+        return  pd.read_excel( 
+            xl, 
+            sheet_name =sheet_name, 
+            usecols =lambda c: '金额' in str(c) or any(k in str(c) for k in time_keywords), 
+        ) 
  
  
     def parse_file_by_month( self , file_path : str) -> Dict[str, Tuple[Decimal, Dict[str, Decimal], int]]: 
@@ -1112,7 +1114,7 @@ class DongFangParser(BaseWarehouseParser):
     def _load_main_df(self, file_path: str):
         """东方嘉盛账单通常只有一个账户明细 sheet，直接读第一个 sheet 即可。"""
         try:
-            return pd.read_excel(file_path, sheet_name=0)
+            return pd.read_excel(file_path, sheet_name=0, engine=EXCEL_ENGINE)
         except Exception:
             return None
 
@@ -1125,13 +1127,15 @@ class DongFangParser(BaseWarehouseParser):
             return Decimal('0'), {}, 0
 
         # 1) 金额列：优先按列名匹配（兼容导出乱码/不同字段名）
+        # 列名字符串 / 小写形式只计算一次，供下面各关键字查找复用
+        columns = list(df.columns)
+        col_names = [str(c) for c in columns]
+        col_names_lower = [n.lower() for n in col_names]
+
         amount_col = None
         preferred_amount_keywords = ["记账金额", "入账金额", "收支金额", "发生额", "交易金额"]
         for kw in preferred_amount_keywords:
-            for c in df.columns:
-                if kw in str(c):
-                    amount_col = c
-                    break
+            amount_col = next((c for c, n in zip(columns, col_names) if kw in n), None)
             if amount_col is not None:
                 break
 
@@ -1139,8 +1143,8 @@ class DongFangParser(BaseWarehouseParser):
         if amount_col is None:
             best = None
             best_score = None
-            for c in df.columns:
-                if str(c).strip().lower() in ["id", "no"]:
+            for c, n in zip(columns, col_names_lower):
+                if n.strip() in ("id", "no"):
                     continue
                 ser = pd.to_numeric(df[c], errors="coerce").dropna()
                 if ser.empty:
@@ -1167,10 +1171,8 @@ class DongFangParser(BaseWarehouseParser):
         type_col = None
         type_keywords = ["交易类型", "业务类型", "类型", "transaction type", "type"]
         for kw in type_keywords:
-            for c in df.columns:
-                if kw.lower() in str(c).lower():
-                    type_col = c
-                    break
+            kw_lower = kw.lower()
+            type_col = next((c for c, n in zip(columns, col_names_lower) if kw_lower in n), None)
             if type_col is not None:
                 break
 
@@ -1265,6 +1267,44 @@ def get_parser(warehouse_name: str) -> BaseWarehouseParser:
     return parsers.get(warehouse_name)
 
 
+def _find_priority_columns(columns, *keyword_groups) -> List:
+    """
+    单次遍历列名，为每组关键字各找出一列（未找到为 None）
+
+    组内关键字按优先级排列：优先取匹配靠前关键字的列，同一关键字取最靠左的列，
+    与「按关键字逐个遍历全部列」的结果一致；各组都命中最高优先级后提前结束。
+    """
+    found = [None] * len(keyword_groups)
+    best = [len(group) for group in keyword_groups]
+    for c in columns:
+        name = str(c)
+        for gi, group in enumerate(keyword_groups):
+            for ki in range(best[gi]):
+                if group[ki] in name:
+                    best[gi] = ki
+                    found[gi] = c
+                    break
+        if not any(best):
+            break
+    return found
+
+
+def _iter_files(dir_path: str, suffixes: Tuple[str, ...], name_filter=None) -> Iterator[str]:
+    """
+    逐个产出目录（含子目录）下扩展名匹配的文件路径
+
+    跳过 Office 临时文件（~$ 开头）；name_filter 为可选的文件名过滤函数。
+    以生成器形式返回，调用方只需部分结果时可提前停止遍历。
+    """
+    for root, _, filenames in os.walk(dir_path):
+        for f in filenames:
+            if f.startswith('~$') or not f.lower().endswith(suffixes):
+                continue
+            if name_filter is not None and not name_filter(f):
+                continue
+            yield os.path.join(root, f)
+
+
 def scan_warehouse_files(base_path: str, warehouse_name: str) -> List[str]:
     """扫描仓库目录下的文件，根据仓库类型决定是否包含PDF文件"""
     wh_path = os.path.join(base_path, warehouse_name)
@@ -1278,40 +1318,31 @@ def scan_warehouse_files(base_path: str, warehouse_name: str) -> List[str]:
     if not os.path.exists(wh_path):
         if warehouse_name == '东方嘉盛':
             # 东方嘉盛导出的文件名通常包含 table-list
-            for root, _, filenames in os.walk(base_path):
-                for f in filenames:
-                    if f.startswith('~$'):
-                        continue
-                    if f.lower().endswith(('.xlsx', '.xls')) and ('table-list' in f.lower() or '账单_' in f):
-                        files.append(os.path.join(root, f))
+            files.extend(_iter_files(
+                base_path, ('.xlsx', '.xls'),
+                lambda f: 'table-list' in f.lower() or '账单_' in f,
+            ))
             # 继续走去重逻辑
         elif warehouse_name == 'G7':
             # G7仓库处理PDF文件
-            for root, _, filenames in os.walk(base_path):
-                for f in filenames:
-                    if f.startswith('~$'):
-                        continue
-                    if f.lower().endswith('.pdf') and ('invoice' in f.lower() or 'credit' in f.lower() or f.startswith('702')):
-                        files.append(os.path.join(root, f))
+            files.extend(_iter_files(
+                base_path, ('.pdf',),
+                lambda f: 'invoice' in f.lower() or 'credit' in f.lower() or f.startswith('702'),
+            ))
         else:
             return files
     
-    for root, dirs, filenames in os.walk(wh_path):
-        for f in filenames:
-            # 根据仓库类型决定扫描的文件类型
-            if warehouse_name in warehouses_needing_pdf:
-                if warehouse_name == 'G7':
-                    # G7仓库：只扫描PDF文件
-                    if f.lower().endswith('.pdf') and not f.startswith('~$'):
-                        files.append(os.path.join(root, f))
-                else:
-                    # 海洋仓库：扫描Excel和PDF文件
-                    if (f.lower().endswith(('.xlsx', '.xls', '.pdf')) and not f.startswith('~$')):
-                        files.append(os.path.join(root, f))
-            else:
-                # 其他仓库：只扫描Excel文件
-                if (f.lower().endswith(('.xlsx', '.xls')) and not f.startswith('~$')):
-                    files.append(os.path.join(root, f))
+    # 根据仓库类型决定扫描的文件类型
+    if warehouse_name == 'G7':
+        # G7仓库：只扫描PDF文件
+        suffixes = ('.pdf',)
+    elif warehouse_name in warehouses_needing_pdf:
+        # 海洋仓库：扫描Excel和PDF文件
+        suffixes = ('.xlsx', '.xls', '.pdf')
+    else:
+        # 其他仓库：只扫描Excel文件
+        suffixes = ('.xlsx', '.xls')
+    files.extend(_iter_files(wh_path, suffixes))
 
     # 去重：同一目录下同名的重复下载文件通常带 "(1)/(2)/(3)" 后缀，避免重复计入
     # 规则：对相同"规范化相对路径"的文件，仅保留最后修改时间最新的那一份
@@ -1361,9 +1392,25 @@ def aggregate_warehouse_costs(base_path: str, warehouses: List[str]) -> List[War
         
         files = scan_warehouse_files(base_path, wh_name)
         
-        # 按月份分组
+        # 按月份分组；files 用 dict 记录（保持首次出现顺序，成员判断 O(1)）
         monthly_data = {}
         
+        def _accumulate(ym: str, filename: str, total: Decimal, breakdown: Dict[str, Decimal], count: int):
+            data = monthly_data.get(ym)
+            if data is None:
+                data = monthly_data[ym] = {
+                    'total': Decimal('0'),
+                    'breakdown': {},
+                    'count': 0,
+                    'files': {}
+                }
+            data['total'] += total
+            data['count'] += count
+            data['files'][filename] = None
+            bd = data['breakdown']
+            for k, v in breakdown.items():
+                bd[k] = bd.get(k, Decimal('0')) + v
+        
         for fp in files:
             try:
                 filename = os.path.basename(fp)
@@ -1373,38 +1420,14 @@ def aggregate_warehouse_costs(base_path: str, warehouses: List[str]) -> List[War
                     for ym, (total, breakdown, count) in monthly_results.items():
                         if not ym:
                             continue
-                        if ym not in monthly_data:
-                            monthly_data[ym] = {
-                                'total': Decimal('0'),
-                                'breakdown': {},
-                                'count': 0,
-                                'files': []
-                            }
-                        monthly_data[ym]['total'] += total
-                        monthly_data[ym]['count'] += count
-                        if filename not in monthly_data[ym]['files']:
-                            monthly_data[ym]['files'].append(filename)
-                        for k, v in breakdown.items():
-                            monthly_data[ym]['breakdown'][k] = monthly_data[ym]['breakdown'].get(k, Decimal('0')) + v
+                        _accumulate(ym, filename, total, breakdown, count)
                 else:
                     # 传递完整文件路径给extract_month方法，以便某些解析器（如G7、京东）可以从路径中提取月份
                     year_month = parser.extract_month(fp)  # 传入完整路径fp而非filename
                     if not year_month:
                         continue
                     total, breakdown, count = parser.parse_file(fp)
-                    if year_month not in monthly_data:
-                        monthly_data[year_month] = {
-                            'total': Decimal('0'),
-                            'breakdown': {},
-                            'count': 0,
-                            'files': []
-                        }
-                    monthly_data[year_month]['total'] += total
-                    monthly_data[year_month]['count'] += count
-                    if filename not in monthly_data[year_month]['files']:
-                        monthly_data[year_month]['files'].append(filename)
-                    for k, v in breakdown.items():
-                        monthly_data[year_month]['breakdown'][k] = monthly_data[year_month]['breakdown'].get(k, Decimal('0')) + v
+                    _accumulate(year_month, filename, total, breakdown, count)
             except Exception as e:
                 print(f"  解析失败 {fp}: {e}")
         
@@ -1417,7 +1440,7 @@ def aggregate_warehouse_costs(base_path: str, warehouses: List[str]) -> List[War
                 currency=parser.currency,
                 cost_breakdown=data['breakdown'],
                 record_count=data['count'],
-                source_files=data['files'],
+                source_files=list(data['files']),
             ))
     
     return results
@@ -26,7 +26,7 @@ class ExcelExporter:
         """
         try:
             # 转换数据
-            rows = [r.to_report_row() for r in results]
+            rows = StoreMonthlyResult.build_report_rows(results)
             headers = StoreMonthlyResult.report_headers()
             
             df = pd.DataFrame(rows, columns=headers)